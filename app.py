@@ -8,23 +8,29 @@ Architecture (event-driven):
 """
 
 import asyncio
-import json
+import heapq
+import itertools
 import logging
 import math
 import os
 import time
 import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Set, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from pydantic import BaseModel, Field
 
-from strategy import StrategyEngine, WatchItem, SignalType
+from strategy import StrategyEngine, WatchItem, Signal, SignalType, CandleSeries
+from strategy_kernels import chart_indicators
 
 # Only import IB when not in demo mode
 DEMO_MODE = os.environ.get("DEMO_MODE", "false").lower() in ("true", "1", "yes")
@@ -41,13 +47,25 @@ logger = logging.getLogger(__name__)
 # --- State ---
 ib = None if DEMO_MODE else IBManager(host="127.0.0.1", port=int(os.environ.get("IB_PORT", "7496")), client_id=11)
 engine = StrategyEngine()
-ws_clients: Set[WebSocket] = set()
+
+
+@dataclass(slots=True)
+class ClientState:
+    """Per-WebSocket state: outbound frame queue and the writer task draining it."""
+    queue: asyncio.Queue
+    writer: asyncio.Task
+    last_hash: Dict[str, int] = field(default_factory=dict)  # dedupe key -> hash of last frame queued
+    options_sent: Dict[str, int] = field(default_factory=dict)  # watch_id -> options_version last queued
+
+
+# Copy-on-write: connect/disconnect rebind a new dict instead of mutating it
+ws_clients: Dict[WebSocket, ClientState] = {}
 monitor_task: Optional[asyncio.Task] = None
 CONFIG_FILE = Path(__file__).parent / "config.json"
+TRADE_LOG_FILE = Path(__file__).parent / "trades.jsonl"  # closed trades, one JSON object per line
 
 # --- Authentication ---
 import secrets
-import hashlib
 from fastapi import Depends, HTTPException, Header
 
 AUTH_USERNAME = os.environ.get("AUTH_USERNAME", "admin")
@@ -59,10 +77,6 @@ _auth_sessions: Dict[str, float] = {}
 SESSION_EXPIRY_HOURS = 24 * 7  # 1 week
 
 
-def _hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-
 def verify_token(authorization: Optional[str] = Header(None)) -> bool:
     """Verify auth token from Authorization header."""
     if not AUTH_ENABLED:
@@ -70,10 +84,11 @@ def verify_token(authorization: Optional[str] = Header(None)) -> bool:
     if not authorization:
         raise HTTPException(status_code=401, detail="未授權")
     token = authorization.replace("Bearer ", "")
-    if token not in _auth_sessions:
+    expiry = _auth_sessions.get(token)
+    if expiry is None:
         raise HTTPException(status_code=401, detail="無效的 token")
-    if time.time() > _auth_sessions[token]:
-        del _auth_sessions[token]
+    if time.time() > expiry:
+        _auth_sessions.pop(token, None)
         raise HTTPException(status_code=401, detail="Token 已過期")
     return True
 
@@ -107,6 +122,10 @@ DEMO_ACCOUNT = {
     "TotalCashValue": {"value": "85000.00", "currency": "USD"},
     "GrossPositionValue": {"value": "40430.50", "currency": "USD"},
 }
+# Simulated price level per symbol (anything else trades around 100)
+DEMO_BASE_PRICES = {"SPY": 602, "QQQ": 520, "AAPL": 235, "MSFT": 420,
+                    "NVDA": 880, "MNQ": 21500, "MES": 6050, "TSLA": 390}
+_demo_rng = np.random.default_rng()  # demo prices/options are drawn as arrays, one call per field
 DEMO_POSITIONS = [
     {"symbol": "SPY", "secType": "STK", "exchange": "SMART", "currency": "USD",
      "strike": None, "right": None, "expiry": None, "position": 50.0,
@@ -122,56 +141,245 @@ DEMO_POSITIONS = [
 # --- Config persistence ---
 def load_config():
     """Load watch list and settings from config.json."""
+    global _saved_watch_list
     if CONFIG_FILE.exists():
         try:
-            data = json.loads(CONFIG_FILE.read_text())
+            data = orjson.loads(CONFIG_FILE.read_bytes())
             for item_data in data.get("watch_list", []):
                 # Backward compat: remove deprecated 'strategy' field
                 item_data.pop("strategy", None)
                 item = WatchItem(**item_data)
                 engine.add_watch(item)
+            _saved_watch_list = engine.get_watch_list()  # what's on disk
             logger.info("Loaded %d watch items from config", len(engine.watch_list))
         except Exception as e:
             logger.error("Failed to load config: %s", e)
 
 
+# Watch-list snapshot last written to disk; engine.get_watch_list() returns the
+# same object until a watch changes, so an identity check detects no-op saves
+_saved_watch_list: Optional[list] = None
+
+
+def _encode_config() -> Tuple[list, bytes]:
+    """Snapshot the watch list as config.json bytes (call on the event loop thread)."""
+    snapshot = engine.get_watch_list()
+    data = {
+        "watch_list": snapshot,
+        "saved_at": datetime.now().isoformat(),
+    }
+    return snapshot, orjson.dumps(data)  # compact — the file is machine-written
+
+
+def _write_config(payload: bytes):
+    """Write config.json atomically (temp file + rename), so a crash can't truncate it."""
+    tmp = CONFIG_FILE.with_suffix(".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, CONFIG_FILE)
+
+
 def save_config():
-    """Save current watch list to config.json."""
+    """Save current watch list to config.json (blocking — used at shutdown)."""
+    global _saved_watch_list
     try:
-        data = {
-            "watch_list": engine.get_watch_list(),
-            "saved_at": datetime.now().isoformat(),
-        }
-        CONFIG_FILE.write_text(json.dumps(data, indent=2))
+        snapshot, payload = _encode_config()
+        if snapshot is _saved_watch_list:
+            return
+        _write_config(payload)
+        _saved_watch_list = snapshot
     except Exception as e:
         logger.error("Failed to save config: %s", e)
 
 
+# Edits only mark the config dirty; a background task writes it at most once
+# per CONFIG_FLUSH_DELAY, off the event loop thread
+CONFIG_FLUSH_DELAY = 5.0  # seconds
+_config_dirty: Optional[asyncio.Event] = None  # created by the flusher on the running loop
+
+
+def schedule_save_config():
+    """Request a debounced config.json write (writes immediately if no flusher runs)."""
+    if _config_dirty is None:
+        save_config()
+    else:
+        _config_dirty.set()
+
+
+async def _config_flusher():
+    """Background task: coalesce config edits and write them in a worker thread."""
+    global _config_dirty, _saved_watch_list
+    _config_dirty = asyncio.Event()
+    while True:
+        await _config_dirty.wait()
+        await asyncio.sleep(CONFIG_FLUSH_DELAY)
+        _config_dirty.clear()
+        try:
+            snapshot, payload = _encode_config()
+            if snapshot is not _saved_watch_list:  # skip if no watch changed since the last write
+                await asyncio.to_thread(_write_config, payload)
+                _saved_watch_list = snapshot
+        except Exception as e:
+            logger.error("Failed to save config: %s", e)
+
+
 # --- WebSocket broadcast ---
+# orjson handles datetime/dataclass/numpy natively; default=str covers the rest
+_WS_JSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+WS_SEND_TIMEOUT = 2.0  # seconds — a client stuck longer than this is dropped
+WS_QUEUE_SIZE = 256  # frames buffered per client before the oldest is dropped
+
+
 async def broadcast(msg: Dict[str, Any]):
     """Send message to all connected WebSocket clients."""
     if not ws_clients:
         return
-    text = json.dumps(msg, default=str)
-    disconnected = set()
-    for ws in list(ws_clients):  # iterate copy to avoid "Set changed size" error
+    # Encode once to bytes; send_bytes skips the per-client str → UTF-8 encode
+    await broadcast_raw(orjson.dumps(msg, default=str, option=_WS_JSON_OPTS))
+
+
+async def broadcast_raw(payload: bytes, dedupe_key: Optional[str] = None):
+    """Queue an already-encoded JSON frame for all connected WebSocket clients.
+
+    Never waits on a socket — each client's writer task does the sending, so a
+    slow client only falls behind on its own queue. With dedupe_key, a client
+    whose last frame under that key was identical is skipped (for slow-changing
+    frames like watch_update / account).
+    """
+    if dedupe_key is None:
+        for state in ws_clients.values():
+            _enqueue(state, payload)
+        return
+    h = hash(payload)
+    for state in ws_clients.values():
+        if state.last_hash.get(dedupe_key) != h:
+            _enqueue(state, payload)
+            state.last_hash[dedupe_key] = h
+
+
+def _enqueue(state: ClientState, payload: bytes):
+    """Put a frame on a client queue, dropping the oldest frame if it is full."""
+    if state.queue.full():
+        state.queue.get_nowait()  # newer state supersedes it
+        # The dropped frame may be a deduped one or carry an options fragment;
+        # let every key and fragment go out again
+        state.last_hash.clear()
+        state.options_sent.clear()
+    state.queue.put_nowait(payload)
+
+
+async def _ws_writer(ws: WebSocket, queue: asyncio.Queue):
+    """Send a client's queued frames in order; closes the socket if a send fails or stalls."""
+    try:
+        while True:
+            payload = await queue.get()
+            await asyncio.wait_for(ws.send_bytes(payload), timeout=WS_SEND_TIMEOUT)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("Dropping WebSocket client: %s", e)
         try:
-            await ws.send_text(text)
+            await ws.close()
         except Exception:
-            disconnected.add(ws)
-    ws_clients.difference_update(disconnected)
+            pass
+
+
+# watch_update frame and GET /api/watch body, re-encoded only when
+# engine.get_watch_list() hands back a new snapshot
+_watch_update_frame: Tuple[Optional[list], bytes] = (None, b"")
+_watch_list_body: Tuple[Optional[list], bytes] = (None, b"")
+
+
+async def broadcast_watch_list():
+    """Send the current watch list to all connected WebSocket clients."""
+    global _watch_update_frame
+    snapshot = engine.get_watch_list()
+    if _watch_update_frame[0] is not snapshot:
+        _watch_update_frame = (snapshot, orjson.dumps(
+            {"type": "watch_update", "watch_list": snapshot}, default=str, option=_WS_JSON_OPTS))
+    await broadcast_raw(_watch_update_frame[1], dedupe_key="watch_update")
 
 
 # --- Options cache ---
-_options_cache: Dict[str, Dict] = {}  # watch_id -> {"call": [...], "put": [...], "ma_price": float}
+_options_cache: Dict[str, Dict] = {}  # watch_id -> {"call_raw"/"put_raw": [...], "call"/"put": grouped, "call_by_expiry"/"put_by_expiry": {expiry: [raw]}, "multiplier_map": {conId: mult}, "ma_price": float, "options_json": bytes, "options_version": int}
+_options_versions = itertools.count(1)  # bumped on every options re-encode, unique across caches
 
 # --- Active trades ---
-_active_trades: Dict[str, Dict] = {}  # trade_id -> trade dict
+_active_trades: "OrderedDict[str, Dict]" = OrderedDict()  # trade_id -> trade dict, oldest first
+_OPEN_TRADE_STATUSES = ("filled", "limit_pending", "exiting")
+MAX_TRADES_IN_MEMORY = 256  # closed trades beyond this live only in TRADE_LOG_FILE
+
+# Exit dispatch index — the monitor loop only looks at trades that can fire:
+# MA/BB exits are checked when their watch gets a price tick, time exits sit in
+# a min-heap keyed by minute-of-day
+_exits_by_watch: Dict[str, List[str]] = {}  # watch_id -> trade_ids with MA/BB exits
+_time_exit_heap: List[Tuple[int, str]] = []  # (exit minute-of-day, trade_id)
+
+
+def _parse_hhmm(value: str) -> Optional[int]:
+    """Parse "HH:MM" into minutes since midnight (None if malformed)."""
+    try:
+        hh, mm = value.split(":")
+        minute = int(hh) * 60 + int(mm)
+    except (AttributeError, ValueError):
+        return None
+    return minute if 0 <= minute < 24 * 60 else None
+
+
+def _register_trade_exits(trade: Dict):
+    """Index a new trade's time / MA / BB exit conditions."""
+    exit_cfg = trade.get("exit") or {}
+    time_exit = exit_cfg.get("time", {})
+    if time_exit.get("enabled") and time_exit.get("value"):
+        exit_minute = _parse_hhmm(time_exit["value"])
+        if exit_minute is None:
+            logger.warning("Ignoring invalid time exit %r for trade %s", time_exit["value"], trade["id"])
+        else:
+            heapq.heappush(_time_exit_heap, (exit_minute, trade["id"]))
+    if exit_cfg.get("ma", {}).get("enabled") or exit_cfg.get("bb", {}).get("enabled"):
+        _exits_by_watch.setdefault(trade["watch_id"], []).append(trade["id"])
+
+
+def _store_trade(trade: Dict):
+    """Add a new trade and index its exits; evicts the oldest closed trades past the cap."""
+    _active_trades[trade["id"]] = trade
+    _register_trade_exits(trade)
+    excess = len(_active_trades) - MAX_TRADES_IN_MEMORY
+    if excess > 0:
+        # Open trades are never evicted; closed ones are already in the trade log
+        for trade_id in [t for t, tr in _active_trades.items() if tr["status"] == "closed"][:excess]:
+            del _active_trades[trade_id]
+
+
+def _append_trade_log(line: bytes):
+    """Append one encoded trade to the trade log (blocking — run via to_thread)."""
+    with TRADE_LOG_FILE.open("ab") as f:
+        f.write(line)
+
+
+async def _sell_trade_legs(trade: Dict, label: str):
+    """Mark a trade as exiting and market-sell every leg."""
+    trade["status"] = "exiting"
+    legs = [o for o in trade["orders"] if o.get("conId") and o.get("qty_requested")]
+    if not legs:
+        return
+    try:
+        # One batch: every leg is submitted before IB's fill wait
+        close_results = await ib.place_market_orders([(o["conId"], "SELL", o["qty_requested"]) for o in legs])
+    except Exception as e:
+        logger.error("%s exit order failed: %s", label, e)
+        return
+    for order_info, close_result in zip(legs, close_results):
+        order_info["exit_order"] = close_result
 
 
 async def _close_trade_and_reset(trade: Dict, reason: str = ""):
     """Close a trade and optionally reset signal_fired based on loop setting."""
     trade["status"] = "closed"
+    try:
+        line = orjson.dumps({**trade, "closed_at": datetime.now().isoformat()}, default=str) + b"\n"
+        await asyncio.to_thread(_append_trade_log, line)
+    except Exception as e:
+        logger.error("Failed to write trade log for %s: %s", trade.get("id"), e)
     watch_id = trade.get("watch_id")
     exit_cfg = trade.get("exit", {})
     loop_enabled = exit_cfg.get("loop", True)  # Default to True for backward compat
@@ -192,13 +400,132 @@ async def _close_trade_and_reset(trade: Dict, reason: str = ""):
     await broadcast({"type": "trade_update", "trade": trade})
 
 
+async def _run_time_exits(now_minute: int):
+    """Fire every time exit due at or before now_minute (minute of day).
+
+    Heap entries for trades that have closed or been evicted are dropped.
+    """
+    while _time_exit_heap and _time_exit_heap[0][0] <= now_minute:
+        _, trade_id = heapq.heappop(_time_exit_heap)
+        trade = _active_trades.get(trade_id)
+        if not trade or trade["status"] not in ("filled", "limit_pending"):
+            continue
+        logger.info("⏰ Time exit triggered for trade %s at %02d:%02d", trade_id, now_minute // 60, now_minute % 60)
+        await _sell_trade_legs(trade, "Time")
+        await _close_trade_and_reset(trade, "時間平倉")
+
+
+async def _run_price_exits(price_data: Dict[str, Any], tick_thresholds: Dict, thresholds: Dict):
+    """Check MA/BB exits, only for trades on watches that got a price this tick."""
+    for watch_id in price_data:
+        trade_ids = _exits_by_watch.get(watch_id)
+        if not trade_ids:
+            continue
+        # Drop trades that have closed since the last tick
+        trade_ids[:] = [
+            t for t in trade_ids
+            if t in _active_trades and _active_trades[t]["status"] in _OPEN_TRADE_STATUSES
+        ]
+        if not trade_ids:
+            del _exits_by_watch[watch_id]
+            continue
+        threshold = tick_thresholds.get(watch_id) or thresholds.get(watch_id)
+        for trade_id in list(trade_ids):
+            await _check_price_exits(trade_id, _active_trades[trade_id], threshold)
+
+
+async def _check_price_exits(trade_id: str, trade: Dict, threshold):
+    """Evaluate a trade's MA / BB exit against the latest price of its watch.
+
+    threshold is the watch's ThresholdCache, already looked up by the tick loop.
+    """
+    exit_cfg = trade.get("exit", {})
+    watch_id = trade["watch_id"]
+
+    # MA-based exit
+    ma_exit = exit_cfg.get("ma", {})
+    if ma_exit.get("enabled") and trade["status"] != "exiting":
+        if threshold and threshold.last_price > 0:
+            current_price = threshold.last_price
+            ma_val = threshold.ma_value
+            cond = ma_exit.get("cond", "above")  # "above" or "below"
+            offset_dir = ma_exit.get("dir", "+")
+            offset_pts = float(ma_exit.get("pts", 5))
+
+            if offset_dir == "+":
+                target = ma_val + offset_pts
+            else:
+                target = ma_val - offset_pts
+
+            triggered = False
+            if cond == "above" and current_price > target:
+                triggered = True
+            elif cond == "below" and current_price < target:
+                triggered = True
+
+            if triggered:
+                logger.info("📊 MA exit triggered for trade %s: price=%.2f target=%.2f", trade_id, current_price, target)
+                await _sell_trade_legs(trade, "MA")
+                await _close_trade_and_reset(trade, "均線平倉")
+                return
+
+    # BB-based exit (for Bollinger Bands strategy)
+    bb_exit = exit_cfg.get("bb", {})
+    if bb_exit.get("enabled") and trade["status"] != "exiting":
+        data = engine.latest_data.get(watch_id, {})
+        if threshold and threshold.last_price > 0:
+            current_price = threshold.last_price
+            bb_middle = data.get("bb_middle") or data.get("ma_value")
+            bb_upper = data.get("bb_upper")
+            bb_lower = data.get("bb_lower")
+            target_type = bb_exit.get("target", "middle")  # "middle" or "opposite"
+            cond = bb_exit.get("cond", "above")  # "above" or "below"
+            offset_dir = bb_exit.get("dir", "+")  # "+" or "-"
+            offset_pts = float(bb_exit.get("pts", 0))
+            trade_dir = trade.get("direction", "BUY")
+
+            # Determine base value based on target
+            base_val = None
+            target_label = ""
+            if target_type == "middle" and bb_middle:
+                base_val = bb_middle
+                target_label = "中軌"
+            elif target_type == "opposite":
+                if trade_dir == "BUY" and bb_upper:
+                    base_val = bb_upper
+                    target_label = "上軌"
+                elif trade_dir == "SELL" and bb_lower:
+                    base_val = bb_lower
+                    target_label = "下軌"
+
+            triggered = False
+            if base_val is not None:
+                # Apply offset
+                if offset_dir == "+":
+                    target = base_val + offset_pts
+                else:
+                    target = base_val - offset_pts
+
+                if cond == "above" and current_price > target:
+                    triggered = True
+                elif cond == "below" and current_price < target:
+                    triggered = True
+
+            if triggered:
+                logger.info("📈 BB exit triggered for trade %s: price=%.2f %s %s%s%.1f = %.2f", 
+                           trade_id, current_price, ">" if cond == "above" else "<", 
+                           target_label, offset_dir, offset_pts, target)
+                await _sell_trade_legs(trade, "BB")
+                await _close_trade_and_reset(trade, "布林帶平倉")
+
+
 async def _auto_execute_trade(watch, signal, opt_cache, underlying_info):
     """Auto-execute trade based on watch trading_config when signal fires.
     
     Args:
         watch: WatchItem with trading_config
         signal: Signal object (BUY or SELL)
-        opt_cache: Cached options {call_raw, put_raw, call, put, ma_price}
+        opt_cache: Cached options {call_raw, put_raw, call, put, ma_price, ...}
         underlying_info: {conId, multiplier, price, ...}
     """
     config = watch.trading_config
@@ -314,16 +641,20 @@ async def _auto_execute_trade(watch, signal, opt_cache, underlying_info):
     trade_id = str(uuid.uuid4())[:8]
     orders = []
     
-    for item in order_items:
-        try:
-            action = "BUY"  # Always buy options/underlying when signal fires
-            result = await ib.place_market_order(item["conId"], action, item["qty"])
-            item["order_result"] = result
-            item["qty_requested"] = item["qty"]
-            orders.append(item)
-            logger.info("✅ Order placed: %s %d %s @ MKT", action, item["qty"], item.get("symbol"))
-        except Exception as e:
-            logger.error("❌ Order failed for %s: %s", item.get("symbol"), e)
+    action = "BUY"  # Always buy options/underlying when signal fires
+    try:
+        results = await ib.place_market_orders([(item["conId"], action, item["qty"]) for item in order_items])
+    except Exception as e:
+        logger.error("❌ Orders failed for %s: %s", watch.symbol, e)
+        results = []
+    for item, result in zip(order_items, results):
+        if result.get("error"):
+            logger.error("❌ Order failed for %s: %s", item.get("symbol"), result["error"])
+            continue
+        item["order_result"] = result
+        item["qty_requested"] = item["qty"]
+        orders.append(item)
+        logger.info("✅ Order placed: %s %d %s @ MKT", action, item["qty"], item.get("symbol"))
     
     if orders:
         exit_cfg = config.get("exit", {})
@@ -334,7 +665,8 @@ async def _auto_execute_trade(watch, signal, opt_cache, underlying_info):
             limit_dir = limit_cfg.get("dir", "+")
             limit_pts = float(limit_cfg.get("pts", 50))
             limit_unit = limit_cfg.get("unit", "pct")
-            
+
+            limit_legs = []
             for order_info in orders:
                 result = order_info.get("order_result", {})
                 fill_price = result.get("avgFillPrice", 0)
@@ -354,16 +686,20 @@ async def _auto_execute_trade(watch, signal, opt_cache, underlying_info):
                         else:
                             limit_price = round(fill_price - limit_pts, 2)
                     
-                    try:
-                        limit_result = await ib.place_limit_order(
-                            order_info["conId"], "SELL", 
-                            order_info.get("qty_requested", 1), limit_price
-                        )
-                        order_info["exit_limit_order"] = limit_result
-                        logger.info("📈 Limit exit placed: SELL %d @ %.2f", 
-                                   order_info.get("qty_requested", 1), limit_price)
-                    except Exception as e:
-                        logger.error("Failed to place limit exit: %s", e)
+                    limit_legs.append((order_info, limit_price))
+
+            if limit_legs:
+                try:
+                    limit_results = await ib.place_limit_orders([
+                        (o["conId"], "SELL", o.get("qty_requested", 1), px) for o, px in limit_legs
+                    ])
+                except Exception as e:
+                    logger.error("Failed to place limit exit: %s", e)
+                    limit_results = []
+                for (order_info, limit_price), limit_result in zip(limit_legs, limit_results):
+                    order_info["exit_limit_order"] = limit_result
+                    logger.info("📈 Limit exit placed: SELL %d @ %.2f",
+                               order_info.get("qty_requested", 1), limit_price)
         
         # Determine status based on whether limit exit orders were placed
         has_limit_exit = any(o.get("exit_limit_order") for o in orders)
@@ -381,7 +717,7 @@ async def _auto_execute_trade(watch, signal, opt_cache, underlying_info):
             "entry_time": datetime.now().isoformat(),
             "entry_price": signal.price,
         }
-        _active_trades[trade_id] = trade
+        _store_trade(trade)
         await broadcast({"type": "trade_update", "trade": trade})
         logger.info("📊 Trade created: %s with %d orders, status=%s", trade_id, len(orders), trade_status)
 
@@ -422,9 +758,8 @@ async def _init_new_watch(watch):
         # Build and broadcast initial data
         data = engine.latest_data.get(watch.id, {})
         if watch.id in _options_cache:
-            data["options_call"] = _options_cache[watch.id]["call"]
-            data["options_put"] = _options_cache[watch.id]["put"]
-            data["locked_ma"] = cache.ma_value
+            data = {**data, "options_call": _options_cache[watch.id]["call"],
+                    "options_put": _options_cache[watch.id]["put"], "locked_ma": cache.ma_value}
 
         await broadcast({"type": "data_update", "watch_id": watch.id, "data": data})
         logger.info("Initialized new watch %s: MA%.0f=%.2f %s, zone=[%.2f,%.2f]",
@@ -436,21 +771,105 @@ async def _init_new_watch(watch):
 
 
 def _group_options(flat_list: list) -> Dict:
-    """Group flat option list into {expiry: {expiry: {value, label}, options: [...]}}."""
+    """Group flat option list into {expiry: {expiry: {value, label}, options: [...]}}.
+
+    The grouped lists hold the same dicts as flat_list (IB contracts live in
+    IBManager, not on the dicts), so price refreshes show up here without copying.
+    """
     grouped = {}
     for o in flat_list:
         exp = o["expiry"]
-        if exp not in grouped:
-            grouped[exp] = {
+        bucket = grouped.get(exp)
+        if bucket is None:
+            bucket = grouped[exp] = {
                 "expiry": {"value": exp, "label": o.get("expiryLabel", f"{exp[4:6]}/{exp[6:8]}")},
                 "options": [],
             }
-        # Don't send internal _contract object to frontend
-        clean = {k: v for k, v in o.items() if k != "_contract"}
-        grouped[exp]["options"].append(clean)
+        bucket["options"].append(o)
     return grouped
 
 
+def _encode_options(cache: Dict):
+    """Pre-serialize the options fragment spliced into the per-tick data_update.
+
+    The fragment only changes when options are re-cached or re-priced, so it is
+    encoded here once under a new version; each client gets it on its next tick
+    and later ticks leave it out (clients merge data_update into what they
+    already have).
+    """
+    cache["options_json"] = orjson.dumps({
+        "options_call": cache["call"],
+        "options_put": cache["put"],
+        "locked_ma": cache["ma_price"],
+    }, default=str, option=_WS_JSON_OPTS)
+    cache["options_version"] = next(_options_versions)
+
+
+def _regroup_options(cache: Dict):
+    """Rebuild grouped call/put views (after the option contracts changed)."""
+    for side in ("call", "put"):
+        grouped = _group_options(cache[f"{side}_raw"])
+        cache[side] = grouped
+        # expiry -> option dicts, for per-expiry price refreshes
+        cache[f"{side}_by_expiry"] = {exp: g["options"] for exp, g in grouped.items()}
+    # conId -> contract multiplier, used to size orders
+    cache["multiplier_map"] = {o["conId"]: o.get("multiplier", 100)
+                               for o in cache["call_raw"] + cache["put_raw"] if o.get("conId")}
+    _encode_options(cache)
+
+
+def _broadcast_data_updates(updates: List[Dict[str, Any]]):
+    """Queue a batch_update for every client, with the options fragments it hasn't had.
+
+    Each entry is encoded once with and once without its options fragment;
+    clients owed the same fragments share one frame.
+    """
+    plain, with_opts = [], []
+    for u in updates:
+        entry = orjson.dumps(u, default=str, option=_WS_JSON_OPTS)
+        plain.append(entry)
+        cache = _options_cache.get(u["watch_id"])
+        if cache:
+            # entry ends with '}}' (data, entry); opts[1:] is '"options_call":...}' which closes data
+            opts = cache["options_json"]
+            with_opts.append((cache["options_version"],
+                              entry[:-2] + (b"," if u["data"] else b"") + opts[1:] + b"}"))
+        else:
+            with_opts.append(None)
+
+    frames: Dict[Tuple[int, ...], bytes] = {}
+    for state in ws_clients.values():
+        owed = tuple(i for i, u in enumerate(updates)
+                     if with_opts[i] and state.options_sent.get(u["watch_id"]) != with_opts[i][0])
+        frame = frames.get(owed)
+        if frame is None:
+            owed_set = set(owed)
+            frame = frames[owed] = b'{"type":"batch_update","updates":[' + b",".join(
+                with_opts[i][1] if i in owed_set else plain[i] for i in range(len(updates))) + b"]}"
+        _enqueue(state, frame)
+        for i in owed:
+            state.options_sent[updates[i]["watch_id"]] = with_opts[i][0]
+
+
+def _prune_option_contracts():
+    """Forget IB option contracts that no cached chain or open trade references."""
+    if ib is None:
+        return
+    in_use = set().union(*(c["multiplier_map"] for c in _options_cache.values()))
+    in_use.update(o["conId"] for t in _active_trades.values() for o in t["orders"] if o.get("conId"))
+    ib.retain_option_contracts(in_use)
+
+
+async def _refresh_option_quotes(*sides: List[Dict[str, Any]]):
+    """Refresh call and put quotes in place as one snapshot batch.
+
+    One combined request waits for quotes once instead of once per side.
+    """
+    options = [o for side in sides for o in side]
+    if options:
+        await ib.refresh_option_prices(options)
+
+
 async def cache_options_for_watch(watch_id: str, watch, ma_price: float, fetch_prices: bool = True):
     """Fetch and cache option contracts based on direction, optionally with initial prices.
     
@@ -478,17 +897,13 @@ async def cache_options_for_watch(watch_id: str, watch, ma_price: float, fetch_p
         
         # Fetch initial prices (batch snapshot)
         if fetch_prices and (calls or puts):
-            if calls:
-                calls = await ib.refresh_option_prices(calls)
-            if puts:
-                puts = await ib.refresh_option_prices(puts)
+            await _refresh_option_quotes(calls, puts)
             logger.info("Fetched initial prices for %s options", watch.symbol)
         
-        _options_cache[watch_id] = {
-            "call_raw": calls, "put_raw": puts,
-            "call": _group_options(calls), "put": _group_options(puts),
-            "ma_price": ma_price,
-        }
+        cache = {"call_raw": calls, "put_raw": puts, "ma_price": ma_price}
+        _regroup_options(cache)
+        _options_cache[watch_id] = cache
+        _prune_option_contracts()
         total = len(calls) + len(puts)
         side = "calls" if direction == "LONG" else "puts"
         logger.info("Cached %d %s for %s (direction=%s, MA=%.2f)",
@@ -498,37 +913,65 @@ async def cache_options_for_watch(watch_id: str, watch, ma_price: float, fetch_p
 
 
 # --- Monitor loop (event-driven) ---
-async def monitor_loop():
-    """Main monitoring loop — event-driven architecture.
+# Max concurrent historical-data requests (IB pacing allows ~50; stay well below)
+BARS_FETCH_CONCURRENCY = 8
+# Max watches initializing (subscribe + option chain) at once
+WATCH_INIT_CONCURRENCY = 4
 
-    Phase 1: Fetch daily bars → calculate thresholds → subscribe streaming → cache options
-    Phase 2: Read streaming prices every ~1s → check thresholds → trigger signals
-    Hourly:  Recalculate MA + thresholds from fresh daily bars
+
+# Negative cache: instruments whose history was missing or too short for their MA
+# aren't re-requested from IB until the retry time (monotonic seconds)
+NO_BARS_RETRY_SECONDS = 4 * 3600
+_no_bars_until: Dict[tuple, float] = {}
+
+
+async def _fetch_bars(watch, sem: asyncio.Semaphore):
+    """Fetch history bars for MA calculation (based on timeframe).
+
+    Returns None without asking IB while the instrument is in the negative cache.
     """
-    logger.info("Monitor loop started (event-driven architecture)")
+    duration, bar_size = get_timeframe_params(watch.timeframe)
+    # 期貨用連續合約獲取歷史數據
+    hist_contract_month = "" if watch.sec_type == "FUT" else watch.contract_month
+    key = (watch.symbol, watch.sec_type, watch.exchange, watch.currency,
+           hist_contract_month, watch.timeframe, watch.ma_period)
+    retry_at = _no_bars_until.get(key)
+    if retry_at is not None and time.monotonic() < retry_at:
+        logger.debug("Skipping bars for %s (no data, retry in %.0fs)", watch.symbol, retry_at - time.monotonic())
+        return None
+    async with sem:
+        df = await ib.get_daily_bars(
+            watch.symbol, watch.sec_type, watch.exchange, watch.currency,
+            duration=duration, bar_size=bar_size, contract_month=hist_contract_month
+        )
+    if df is None or len(df) < watch.ma_period + 1:
+        if ib.connected:  # a disconnect also yields None — that's not the instrument's fault
+            _no_bars_until[key] = time.monotonic() + NO_BARS_RETRY_SECONDS
+    else:
+        _no_bars_until.pop(key, None)
+    return df
 
-    # ── Phase 1: Initialize all watch items ──
-    initialized = set()
-    for watch_id, watch in list(engine.watch_list.items()):
-        if not watch.enabled:
-            continue
+
+async def _fetch_all_bars(watches: list) -> list:
+    """Fetch bars for several watches concurrently; failures come back as exceptions."""
+    sem = asyncio.Semaphore(BARS_FETCH_CONCURRENCY)
+    return await asyncio.gather(*(_fetch_bars(w, sem) for w in watches), return_exceptions=True)
+
+
+async def _init_monitor_watch(watch_id: str, watch, df, sem: asyncio.Semaphore) -> bool:
+    """Phase 1 for one watch: thresholds → streaming subscription → options → first data_update."""
+    async with sem:
         try:
-            # Fetch bars for MA calculation (based on timeframe)
-            # 期貨用連續合約獲取歷史數據
-            duration, bar_size = get_timeframe_params(watch.timeframe)
-            hist_contract_month = "" if watch.sec_type == "FUT" else watch.contract_month
-            df = await ib.get_daily_bars(
-                watch.symbol, watch.sec_type, watch.exchange, watch.currency,
-                duration=duration, bar_size=bar_size, contract_month=hist_contract_month
-            )
+            if isinstance(df, Exception):
+                raise df
             if df is None or len(df) < watch.ma_period + 1:
                 logger.warning("Insufficient data for %s", watch.symbol)
-                continue
+                return False
 
             # Calculate MA + trigger thresholds (stored in engine._thresholds)
             cache = engine.calculate_thresholds(watch_id, df, watch)
             if not cache:
-                continue
+                return False
 
             # Subscribe to streaming price data (continuous, not snapshot)
             subscribed = await ib.subscribe_price(
@@ -537,7 +980,7 @@ async def monitor_loop():
             )
             if not subscribed:
                 logger.warning("Failed to subscribe %s", watch.symbol)
-                continue
+                return False
 
             # Cache option contracts
             await cache_options_for_watch(watch_id, watch, cache.ma_value)
@@ -545,25 +988,54 @@ async def monitor_loop():
             # Broadcast initial data
             data = engine.latest_data.get(watch_id, {})
             if watch_id in _options_cache:
-                data["options_call"] = _options_cache[watch_id]["call"]
-                data["options_put"] = _options_cache[watch_id]["put"]
-                data["locked_ma"] = cache.ma_value
+                data = {**data, "options_call": _options_cache[watch_id]["call"],
+                        "options_put": _options_cache[watch_id]["put"], "locked_ma": cache.ma_value}
 
             await broadcast({"type": "data_update", "watch_id": watch_id, "data": data})
-            initialized.add(watch_id)
             logger.info("Initialized %s: MA%.0f=%.2f %s, zone=[%.2f,%.2f]",
                          watch.symbol, cache.ma_period, cache.ma_value,
                          cache.ma_direction, cache.trigger_low, cache.trigger_high)
+            return True
         except Exception as e:
             logger.error("Failed to init %s: %s", watch.symbol, e)
+            return False
+
 
+async def _recache_options(watch_id: str, watch, ma_price: float, sem: asyncio.Semaphore):
+    """Hourly recalc: re-fetch a watch's option chain around its shifted MA."""
+    async with sem:
+        await cache_options_for_watch(watch_id, watch, ma_price)
+    logger.info("Re-cached options for %s (MA shifted)", watch.symbol)
+
+
+async def monitor_loop():
+    """Main monitoring loop — event-driven architecture.
+
+    Phase 1: Fetch daily bars → calculate thresholds → subscribe streaming → cache options
+    Phase 2: Read streaming prices on each tick update (≤1s) → check thresholds → trigger signals
+    Hourly:  Recalculate MA + thresholds from fresh daily bars
+    """
+    logger.info("Monitor loop started (event-driven architecture)")
+
+    # ── Phase 1: Initialize all watch items ──
+    items = list(engine._enabled_watches.items())
+    # Fetch bars for MA calculation for all watches at once
+    all_bars = await _fetch_all_bars([watch for _, watch in items])
+    # Then subscribe + cache options for every watch concurrently
+    sem = asyncio.Semaphore(WATCH_INIT_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_init_monitor_watch(watch_id, watch, df, sem) for (watch_id, watch), df in zip(items, all_bars))
+    )
     await broadcast({"type": "status", "connected": True, "monitoring": True,
-                     "message": f"監控已啟動 ({len(initialized)}/{len(engine.watch_list)} 標的)"})
+                     "message": f"監控已啟動 ({sum(results)}/{len(engine.watch_list)} 標的)"})
 
     # ── Phase 2: Event-driven price monitoring ──
     last_calc_time = time.time()
     last_account_time = 0
     last_broadcast_prices: Dict[str, float] = {}  # track last broadcast price to avoid spam
+    # Hot-loop lookups resolved once (these are never rebound)
+    check_price = engine.check_price
+    thresholds = engine._thresholds
 
     while engine.running:
         try:
@@ -582,9 +1054,17 @@ async def monitor_loop():
                 logger.info("📊 Read %d prices: %s", len(price_data), 
                            {k: v.get('price', v) if isinstance(v, dict) else v for k, v in list(price_data.items())[:2]})
 
+            # Per-tick data updates are coalesced into one batch frame (signals stay immediate)
+            updates: List[Dict[str, Any]] = []
+            tick_thresholds: Dict[str, Any] = {}  # watch_id -> ThresholdCache, reused by exit checks
+            now_iso = datetime.now().isoformat()  # one timestamp for every watch this tick
+            # Signals, auto-trades and exits run regardless; display payloads only for viewers
+            has_clients = bool(ws_clients)
+
+            enabled_watches = engine._enabled_watches  # rebound (not mutated) on changes — read per tick
             for watch_id, pdata in price_data.items():
-                watch = engine.watch_list.get(watch_id)
-                if not watch or not watch.enabled:
+                watch = enabled_watches.get(watch_id)
+                if not watch:
                     continue
 
                 price = pdata["price"] if isinstance(pdata, dict) else pdata
@@ -598,11 +1078,11 @@ async def monitor_loop():
                 logger.debug("Price check: %s price=%.2f old=%.2f changed=%s", watch.symbol, price, old_price, price_changed)
 
                 # Check signal using pre-calculated thresholds (just a comparison)
-                signal = engine.check_price(watch_id, price)
+                signal, tick_thresholds[watch_id] = check_price(watch_id, price, now_iso)
 
-                # Broadcast data_update when price changes
-                if price_changed or signal:
-                    logger.info("📤 Broadcasting data_update for %s: price=%.2f (changed=%s)", watch.symbol, price, price_changed)
+                # Queue data_update when price changes
+                if has_clients and (price_changed or signal):
+                    logger.info("📤 Queueing data_update for %s: price=%.2f (changed=%s)", watch.symbol, price, price_changed)
                     data = engine.latest_data.get(watch_id, {})
                     
                     # Include day OHLC for live candle
@@ -610,33 +1090,23 @@ async def monitor_loop():
                     data["day_high"] = day_high
                     data["day_low"] = day_low
 
-                    # Include cached options
-                    if watch_id in _options_cache:
-                        data["options_call"] = _options_cache[watch_id]["call"]
-                        data["options_put"] = _options_cache[watch_id]["put"]
-                        data["locked_ma"] = _options_cache[watch_id]["ma_price"]
+                    # Changed options are spliced in per client (see _broadcast_data_updates)
 
                     # Include underlying contract info for direct futures trading
                     underlying_info = ib.get_underlying_info(watch_id)
                     if underlying_info:
                         data["underlying"] = underlying_info
 
-                    await broadcast({"type": "data_update", "watch_id": watch_id, "data": data})
+                    updates.append({"watch_id": watch_id, "data": data})
                     last_broadcast_prices[watch_id] = price
 
                 if signal:
                     # 🔔 Signal triggered! Refresh option prices for order-ready data
                     opt_cache = _options_cache.get(watch_id)
                     if opt_cache:
-                        if opt_cache["call_raw"]:
-                            await ib.refresh_option_prices(opt_cache["call_raw"])
-                            opt_cache["call"] = _group_options(opt_cache["call_raw"])
-                        if opt_cache["put_raw"]:
-                            await ib.refresh_option_prices(opt_cache["put_raw"])
-                            opt_cache["put"] = _group_options(opt_cache["put_raw"])
-                        data["options_call"] = opt_cache["call"]
-                        data["options_put"] = opt_cache["put"]
-                        await broadcast({"type": "data_update", "watch_id": watch_id, "data": data})
+                        await _refresh_option_quotes(opt_cache["call_raw"], opt_cache["put_raw"])
+                        # data is already queued in this tick's batch and picks up the new fragment
+                        _encode_options(opt_cache)
                         logger.info("Signal triggered: refreshed %s option prices", watch.symbol)
 
                     await broadcast({
@@ -648,159 +1118,52 @@ async def monitor_loop():
                     
                     # 🤖 Auto-execute trade if configured
                     if watch.trading_config and watch.trading_config.get("auto_trade"):
-                        await _auto_execute_trade(watch, signal, opt_cache, underlying_info)
+                        await _auto_execute_trade(watch, signal, opt_cache, ib.get_underlying_info(watch_id))
 
-            # ── Exit strategy monitoring ──
-            for trade_id, trade in list(_active_trades.items()):
-                if trade["status"] not in ("filled", "limit_pending", "exiting"):
-                    continue
+            if updates:
+                _broadcast_data_updates(updates)
 
-                exit_cfg = trade.get("exit", {})
-                watch_id = trade["watch_id"]
-
-                # Time-based exit
-                time_exit = exit_cfg.get("time", {})
-                if time_exit.get("enabled"):
-                    exit_time_str = time_exit.get("value", "")  # "HH:MM"
-                    if exit_time_str:
-                        now_time = datetime.now().strftime("%H:%M")
-                        if now_time >= exit_time_str and trade["status"] != "exiting":
-                            trade["status"] = "exiting"
-                            logger.info("⏰ Time exit triggered for trade %s at %s", trade_id, now_time)
-                            for order_info in trade["orders"]:
-                                if order_info.get("conId") and order_info.get("qty_requested"):
-                                    try:
-                                        close_result = await ib.place_market_order(order_info["conId"], "SELL", order_info["qty_requested"])
-                                        order_info["exit_order"] = close_result
-                                    except Exception as e:
-                                        logger.error("Time exit order failed: %s", e)
-                            await _close_trade_and_reset(trade, "時間平倉")
-
-                # MA-based exit
-                ma_exit = exit_cfg.get("ma", {})
-                if ma_exit.get("enabled") and trade["status"] != "exiting":
-                    threshold = engine._thresholds.get(watch_id)
-                    if threshold and threshold.last_price > 0:
-                        current_price = threshold.last_price
-                        ma_val = threshold.ma_value
-                        cond = ma_exit.get("cond", "above")  # "above" or "below"
-                        offset_dir = ma_exit.get("dir", "+")
-                        offset_pts = float(ma_exit.get("pts", 5))
-
-                        if offset_dir == "+":
-                            target = ma_val + offset_pts
-                        else:
-                            target = ma_val - offset_pts
-
-                        triggered = False
-                        if cond == "above" and current_price > target:
-                            triggered = True
-                        elif cond == "below" and current_price < target:
-                            triggered = True
-
-                        if triggered:
-                            trade["status"] = "exiting"
-                            logger.info("📊 MA exit triggered for trade %s: price=%.2f target=%.2f", trade_id, current_price, target)
-                            for order_info in trade["orders"]:
-                                if order_info.get("conId") and order_info.get("qty_requested"):
-                                    try:
-                                        close_result = await ib.place_market_order(order_info["conId"], "SELL", order_info["qty_requested"])
-                                        order_info["exit_order"] = close_result
-                                    except Exception as e:
-                                        logger.error("MA exit order failed: %s", e)
-                            await _close_trade_and_reset(trade, "均線平倉")
-
-                # BB-based exit (for Bollinger Bands strategy)
-                bb_exit = exit_cfg.get("bb", {})
-                if bb_exit.get("enabled") and trade["status"] != "exiting":
-                    threshold = engine._thresholds.get(watch_id)
-                    data = engine.latest_data.get(watch_id, {})
-                    if threshold and threshold.last_price > 0:
-                        current_price = threshold.last_price
-                        bb_middle = data.get("bb_middle") or data.get("ma_value")
-                        bb_upper = data.get("bb_upper")
-                        bb_lower = data.get("bb_lower")
-                        target_type = bb_exit.get("target", "middle")  # "middle" or "opposite"
-                        cond = bb_exit.get("cond", "above")  # "above" or "below"
-                        offset_dir = bb_exit.get("dir", "+")  # "+" or "-"
-                        offset_pts = float(bb_exit.get("pts", 0))
-                        trade_dir = trade.get("direction", "BUY")
-
-                        # Determine base value based on target
-                        base_val = None
-                        target_label = ""
-                        if target_type == "middle" and bb_middle:
-                            base_val = bb_middle
-                            target_label = "中軌"
-                        elif target_type == "opposite":
-                            if trade_dir == "BUY" and bb_upper:
-                                base_val = bb_upper
-                                target_label = "上軌"
-                            elif trade_dir == "SELL" and bb_lower:
-                                base_val = bb_lower
-                                target_label = "下軌"
-
-                        if base_val is not None:
-                            # Apply offset
-                            if offset_dir == "+":
-                                target = base_val + offset_pts
-                            else:
-                                target = base_val - offset_pts
-
-                            triggered = False
-                            if cond == "above" and current_price > target:
-                                triggered = True
-                            elif cond == "below" and current_price < target:
-                                triggered = True
-
-                        if triggered:
-                            trade["status"] = "exiting"
-                            logger.info("📈 BB exit triggered for trade %s: price=%.2f %s %s%s%.1f = %.2f", 
-                                       trade_id, current_price, ">" if cond == "above" else "<", 
-                                       target_label, offset_dir, offset_pts, target)
-                            for order_info in trade["orders"]:
-                                if order_info.get("conId") and order_info.get("qty_requested"):
-                                    try:
-                                        close_result = await ib.place_market_order(order_info["conId"], "SELL", order_info["qty_requested"])
-                                        order_info["exit_order"] = close_result
-                                    except Exception as e:
-                                        logger.error("BB exit order failed: %s", e)
-                            await _close_trade_and_reset(trade, "布林帶平倉")
+            # ── Exit strategy monitoring ──
+            now_tm = time.localtime()
+            await _run_time_exits(now_tm.tm_hour * 60 + now_tm.tm_min)
+            await _run_price_exits(price_data, tick_thresholds, thresholds)
 
             # ── Hourly recalculation ──
             now = time.time()
             if now - last_calc_time >= 3600:
                 logger.info("⏰ Hourly recalculation started")
-                for watch_id, watch in list(engine.watch_list.items()):
-                    if not watch.enabled:
-                        continue
+                items = list(engine._enabled_watches.items())
+                all_bars = await _fetch_all_bars([watch for _, watch in items])
+                recache = []  # (watch_id, watch, new MA) whose option chain needs re-fetching
+                for (watch_id, watch), df in zip(items, all_bars):
                     try:
-                        duration, bar_size = get_timeframe_params(watch.timeframe)
-                        hist_contract_month = "" if watch.sec_type == "FUT" else watch.contract_month
-                        df = await ib.get_daily_bars(
-                            watch.symbol, watch.sec_type, watch.exchange, watch.currency,
-                            duration=duration, bar_size=bar_size, contract_month=hist_contract_month
-                        )
+                        if isinstance(df, Exception):
+                            raise df
                         if df is not None and len(df) >= watch.ma_period + 1:
                             new_cache = engine.calculate_thresholds(watch_id, df, watch)
                             if new_cache:
                                 # Re-cache options if MA shifted significantly
                                 old_ma = _options_cache.get(watch_id, {}).get("ma_price", 0)
                                 if abs(new_cache.ma_value - old_ma) > watch.n_points * 0.5:
-                                    await cache_options_for_watch(watch_id, watch, new_cache.ma_value)
-                                    logger.info("Re-cached options for %s (MA shifted)", watch.symbol)
+                                    recache.append((watch_id, watch, new_cache.ma_value))
                     except Exception as e:
                         logger.error("Hourly recalc error for %s: %s", watch.symbol, e)
+                if recache:
+                    sem = asyncio.Semaphore(WATCH_INIT_CONCURRENCY)
+                    await asyncio.gather(*(_recache_options(watch_id, watch, ma, sem)
+                                           for watch_id, watch, ma in recache))
                 last_calc_time = now
                 logger.info("⏰ Hourly recalculation complete")
 
-            # ── Account update every 5 minutes ──
-            if now - last_account_time >= 300:
+            # ── Account update every 5 minutes (display only; new clients fetch their own) ──
+            if ws_clients and now - last_account_time >= 300:
                 try:
-                    account = await ib.get_account_summary()
-                    positions = await ib.get_positions()
-                    orders = await ib.get_open_orders()
-                    await broadcast({"type": "account", "summary": account, "positions": positions, "orders": orders, "connected": True})
+                    account, positions, orders = await ib.get_account_snapshot()
+                    account_frame = orjson.dumps(
+                        {"type": "account", "summary": account, "positions": positions, "orders": orders, "connected": True},
+                        default=str, option=_WS_JSON_OPTS)
+                    # Clients that already have this exact account state are skipped
+                    await broadcast_raw(account_frame, dedupe_key="account")
                     last_account_time = now
                 except Exception as e:
                     logger.error("Account data error: %s", e)
@@ -809,7 +1172,8 @@ async def monitor_loop():
             logger.error("Monitor loop error: %s", e)
             await broadcast({"type": "error", "message": str(e)})
 
-        await asyncio.sleep(1)  # 1-second tick — reads cached prices, no heavy API calls
+        # Wake as soon as IB pushes new ticks; the 1s timeout keeps hourly/account timers running
+        await ib.wait_for_prices(timeout=1.0)
 
     # Cleanup: unsubscribe all price streams
     await ib.unsubscribe_all()
@@ -819,18 +1183,26 @@ async def monitor_loop():
 # --- Lifespan ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global _config_dirty
     load_config()
     if DEMO_MODE:
         logger.info("🎮 Running in DEMO MODE — no IB connection required")
+    loop_type = type(asyncio.get_running_loop())
+    logger.info("Event loop: %s.%s", loop_type.__module__, loop_type.__name__)
+    if not DEMO_MODE and loop_type.__module__.startswith("uvloop"):
+        logger.warning("uvloop is not supported with ib_insync — run uvicorn with --loop asyncio")
+    flusher = asyncio.create_task(_config_flusher())
     yield
     engine.stop()
     if ib:
         await ib.disconnect()
-    save_config()
+    flusher.cancel()
+    _config_dirty = None
+    save_config()  # final flush — includes any edits still inside the debounce window
 
 
 # --- App ---
-app = FastAPI(title="Trading Monitor", lifespan=lifespan)
+app = FastAPI(title="Trading Monitor", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 # --- Pydantic models ---
@@ -902,7 +1274,10 @@ class WatchItemUpdate(BaseModel):
 @app.post("/api/auth/login")
 async def login(req: LoginRequest):
     """Login and get session token."""
-    if req.username != AUTH_USERNAME or req.password != AUTH_PASSWORD:
+    # Constant-time compare; evaluate both so timing doesn't reveal which one failed
+    user_ok = secrets.compare_digest(req.username.encode(), AUTH_USERNAME.encode())
+    pass_ok = secrets.compare_digest(req.password.encode(), AUTH_PASSWORD.encode())
+    if not (user_ok and pass_ok):
         raise HTTPException(status_code=401, detail="帳號或密碼錯誤")
     
     # Generate session token
@@ -962,8 +1337,7 @@ async def disconnect_ib():
 async def get_account():
     if DEMO_MODE:
         return {"summary": DEMO_ACCOUNT, "positions": DEMO_POSITIONS}
-    summary = await ib.get_account_summary()
-    positions = await ib.get_positions()
+    summary, positions = await asyncio.gather(ib.get_account_summary(), ib.get_positions())
     return {"summary": summary, "positions": positions}
 
 
@@ -1025,7 +1399,11 @@ async def close_position(req: ClosePositionRequest):
 # --- Watch list ---
 @app.get("/api/watch")
 async def get_watch_list():
-    return engine.get_watch_list()
+    global _watch_list_body
+    snapshot = engine.get_watch_list()
+    if _watch_list_body[0] is not snapshot:
+        _watch_list_body = (snapshot, orjson.dumps(snapshot, default=str, option=_WS_JSON_OPTS))
+    return Response(content=_watch_list_body[1], media_type="application/json")
 
 
 @app.post("/api/watch")
@@ -1058,13 +1436,14 @@ async def add_watch(item: WatchItemCreate):
         trading_config=trading_cfg,
     )
     engine.add_watch(watch)
-    save_config()
-    await broadcast({"type": "watch_update", "watch_list": engine.get_watch_list()})
+    schedule_save_config()
+    await broadcast_watch_list()
     
     # If monitoring, initialize the new watch (fetch data + cache options)
     if engine.running and not DEMO_MODE and ib and ib.connected:
         asyncio.create_task(_init_new_watch(watch))
-    
+    wake_demo_monitor()
+
     return watch.to_dict()
 
 
@@ -1073,9 +1452,9 @@ async def update_watch(watch_id: str, updates: WatchItemUpdate):
     old_watch = engine.watch_list.get(watch_id)
     was_enabled = old_watch.enabled if old_watch else False
 
-    update_dict = {k: v for k, v in updates.model_dump().items() if v is not None}
+    update_dict = updates.model_dump(exclude_none=True)
     engine.update_watch(watch_id, update_dict)
-    save_config()
+    schedule_save_config()
 
     watch = engine.watch_list.get(watch_id)
     now_enabled = watch.enabled if watch else False
@@ -1089,13 +1468,14 @@ async def update_watch(watch_id: str, updates: WatchItemUpdate):
             logger.info("Watch %s (%s) resumed — signal reset", watch_id, watch.symbol)
         if engine.running and not DEMO_MODE and ib and ib.connected:
             asyncio.create_task(_init_new_watch(watch))
+        wake_demo_monitor()
 
     # Handle resume → pause: unsubscribe streaming to save resources
     if was_enabled and not now_enabled and engine.running and not DEMO_MODE and ib:
         logger.info("Watch %s (%s) paused — unsubscribing", watch_id, watch.symbol)
         await ib.unsubscribe_price(watch_id)
 
-    await broadcast({"type": "watch_update", "watch_list": engine.get_watch_list()})
+    await broadcast_watch_list()
     return {"ok": True}
 
 
@@ -1104,10 +1484,12 @@ async def delete_watch(watch_id: str):
     # Unsubscribe price stream
     if not DEMO_MODE and ib and engine.running:
         await ib.unsubscribe_price(watch_id)
-    _options_cache.pop(watch_id, None)
+    if _options_cache.pop(watch_id, None):
+        _prune_option_contracts()
+    _indicator_cache.pop(watch_id, None)
     engine.remove_watch(watch_id)
-    save_config()
-    await broadcast({"type": "watch_update", "watch_list": engine.get_watch_list()})
+    schedule_save_config()
+    await broadcast_watch_list()
     return {"ok": True}
 
 
@@ -1182,82 +1564,115 @@ async def get_thresholds():
     return result
 
 
-@app.get("/api/candles/{watch_id}")
-async def get_candles(watch_id: str):
-    """Get candlestick data for chart rendering."""
-    watch = engine.watch_list.get(watch_id)
-    if not watch:
-        raise HTTPException(status_code=404, detail="Watch not found")
-    
-    candles = engine.get_candles(watch_id)
-    
-    # If no cached candles, fetch from IB
-    # 期貨用連續合約獲取歷史數據
-    if not candles and ib.connected:
-        try:
-            duration, bar_size = get_timeframe_params(watch.timeframe)
-            hist_contract_month = "" if watch.sec_type == "FUT" else (watch.contract_month or None)
-            df = await ib.get_daily_bars(
-                symbol=watch.symbol,
-                sec_type=watch.sec_type,
-                exchange=watch.exchange,
-                currency=watch.currency,
-                duration=duration,
-                bar_size=bar_size,
-                contract_month=hist_contract_month,
-            )
-            if df is not None and len(df) > 0:
-                import time as _time
-                candles = []
-                for idx, row in df.tail(120).iterrows():
-                    ts = int(idx.timestamp()) if hasattr(idx, 'timestamp') else int(_time.time())
-                    candles.append({
-                        "time": ts,
-                        "open": float(row["open"]),
-                        "high": float(row["high"]),
-                        "low": float(row["low"]),
-                        "close": float(row["close"]),
-                    })
-                engine._candles[watch_id] = candles
-        except Exception as e:
-            logger.warning("Failed to fetch candles for %s: %s", watch.symbol, e)
-    
-    threshold = engine.get_threshold(watch_id)
+# Chart overlay memo: watch_id -> (key, (ma, bb_upper, bb_lower, confirm_ma), candles)
+_indicator_cache: Dict[str, Tuple[tuple, tuple, CandleSeries]] = {}
+
+
+def _incremental_overlays(prev: tuple, candles: CandleSeries, watch, period: int, confirm_period: int):
+    """Update cached overlays when only the newest bar is new or changed.
+
+    Handles the three shapes a refreshed candle window takes: same bars with
+    the last close updated, one bar appended, or the window slid by one bar.
+    Only the last point of each series is recomputed. Returns None if the
+    earlier bars differ (caller does a full recompute).
+    """
+    _, (ma_data, bb_upper_data, bb_lower_data, confirm_ma_data), old = prev
+    n = len(candles)
+    if n == len(old) and old.time[-1] == candles.time[-1]:
+        old_part, drop_first, replace_last = slice(0, n - 1), False, True
+    elif n == len(old):
+        old_part, drop_first, replace_last = slice(1, n), True, False
+    elif n == len(old) + 1:
+        old_part, drop_first, replace_last = slice(0, n - 1), False, False
+    else:
+        return None
+    if not (np.array_equal(old.time[old_part], candles.time[:-1])
+            and np.array_equal(old.close[old_part], candles.close[:-1])):
+        return None
+
+    # Last point of each series from the trailing window only
+    tail = candles.close[-max(period, confirm_period, 1):]
+    ma_arr, upper_arr, lower_arr, confirm_arr = chart_indicators(
+        tail, int(period), float(watch.bb_std_dev), int(confirm_period)
+    )
+    last_time = int(candles.time[-1])
+
+    def update(series: list, exists: bool, value: float) -> list:
+        out = series[1:] if drop_first and series else list(series)
+        if replace_last and out:
+            out.pop()
+        if exists:
+            out.append({"time": last_time, "value": float(np.round(value, 4))})
+        return out
+
+    has_ma = period >= 1 and n >= period
+    has_bb = watch.strategy_type == "BB" and period >= 1 and n > period
+    has_confirm = confirm_period > 0 and n >= confirm_period
+    return (
+        update(ma_data, has_ma, ma_arr[-1]),
+        update(bb_upper_data, has_bb, upper_arr[-1]),
+        update(bb_lower_data, has_bb, lower_arr[-1]),
+        update(confirm_ma_data, has_confirm, confirm_arr[-1]),
+    )
+
+
+def _chart_overlays(watch_id: str, watch, candles: Optional[CandleSeries]) -> tuple:
+    """MA / BB / confirm-MA point lists for the chart, cached per watch."""
+    if not candles:
+        return [], [], [], []
+    period = watch.ma_period
+    confirm_period = watch.confirm_ma_period if watch.confirm_ma_enabled else 0
+    key = (len(candles), int(candles.time[-1]), float(candles.close[-1]), period, confirm_period,
+           watch.bb_std_dev, watch.strategy_type)
+    hit = _indicator_cache.get(watch_id)
+    if hit and hit[0] == key:
+        return hit[1]
+    if hit and hit[0][3:] == key[3:]:
+        # Same parameters — usually only the newest bar differs
+        result = _incremental_overlays(hit, candles, watch, period, confirm_period)
+        if result is not None:
+            _indicator_cache[watch_id] = (key, result, candles)
+            return result
+
     ma_data = []
-    
-    # Calculate MA for chart overlay
+    bb_upper_data = []
+    bb_lower_data = []
     confirm_ma_data = []
+    closes_arr = candles.close
+    times = candles.time.tolist()
+    # Round whole arrays once (NumPy) rather than per point
+    ma_arr, upper_arr, lower_arr, confirm_arr = (np.round(a, 4) for a in chart_indicators(
+        closes_arr, int(period), float(watch.bb_std_dev), int(confirm_period)
+    ))
+    if period >= 1:
+        ma_data = [{"time": t, "value": v}
+                   for t, v in zip(times[period - 1:], ma_arr[period - 1:].tolist())]
+
+        # Bollinger Bands start one bar after the first MA point
+        if watch.strategy_type == "BB":
+            for t, upper, lower in zip(times[period:], upper_arr[period:].tolist(), lower_arr[period:].tolist()):
+                bb_upper_data.append({"time": t, "value": upper})
+                bb_lower_data.append({"time": t, "value": lower})
+
+    # Calculate confirm MA if enabled
+    if confirm_period > 0:
+        confirm_ma_data = [{"time": t, "value": v}
+                           for t, v in zip(times[confirm_period - 1:], confirm_arr[confirm_period - 1:].tolist())]
+
+    result = (ma_data, bb_upper_data, bb_lower_data, confirm_ma_data)
+    _indicator_cache[watch_id] = (key, result, candles)
+    return result
+
+
+def _compute_chart_payload(watch_id: str, watch, candles: Optional[CandleSeries], threshold) -> bytes:
+    """Build and encode the /api/candles response (CPU-bound — run off the event loop)."""
     trigger_low = None
     trigger_high = None
-    
-    bb_upper_data = []
-    bb_lower_data = []
-    
+
+    # MA / BB / confirm-MA overlays (memoized until the candles or params change)
+    ma_data, bb_upper_data, bb_lower_data, confirm_ma_data = _chart_overlays(watch_id, watch, candles)
+
     if candles:
-        closes = [c["close"] for c in candles]
-        period = watch.ma_period
-        for i, c in enumerate(candles):
-            if i >= period - 1:
-                ma_val = sum(closes[i - period + 1:i + 1]) / period
-                ma_data.append({"time": c["time"], "value": round(ma_val, 4)})
-                
-                # Calculate BB bands if BB strategy
-                if watch.strategy_type == "BB" and i >= period:
-                    window = closes[i - period + 1:i + 1]
-                    std_val = (sum((x - ma_val) ** 2 for x in window) / period) ** 0.5
-                    bb_upper = ma_val + watch.bb_std_dev * std_val
-                    bb_lower = ma_val - watch.bb_std_dev * std_val
-                    bb_upper_data.append({"time": c["time"], "value": round(bb_upper, 4)})
-                    bb_lower_data.append({"time": c["time"], "value": round(bb_lower, 4)})
-        
-        # Calculate confirm MA if enabled
-        if watch.confirm_ma_enabled and watch.confirm_ma_period > 0:
-            confirm_period = watch.confirm_ma_period
-            for i, c in enumerate(candles):
-                if i >= confirm_period - 1:
-                    ma_val = sum(closes[i - confirm_period + 1:i + 1]) / confirm_period
-                    confirm_ma_data.append({"time": c["time"], "value": round(ma_val, 4)})
-        
         # Calculate trigger zone
         if watch.strategy_type == "BB" and bb_upper_data and bb_lower_data:
             # BB strategy: trigger at upper/lower band
@@ -1280,10 +1695,10 @@ async def get_candles(watch_id: str):
             elif ma_falling:
                 trigger_low = current_ma - watch.n_points
                 trigger_high = current_ma
-    
-    return {
+
+    return orjson.dumps({
         "symbol": watch.symbol,
-        "candles": candles,
+        "candles": candles.to_list() if candles else [],
         "ma": ma_data,
         "ma_period": watch.ma_period,
         "bb_upper": bb_upper_data if watch.strategy_type == "BB" else None,
@@ -1297,7 +1712,65 @@ async def get_candles(watch_id: str):
         "trigger_low": trigger_low if trigger_low else (threshold.trigger_low if threshold else None),
         "trigger_high": trigger_high if trigger_high else (threshold.trigger_high if threshold else None),
         "timeframe": watch.timeframe,  # D=日, W=週, M=月
-    }
+    }, default=str, option=_WS_JSON_OPTS)
+
+
+@app.get("/api/candles/{watch_id}")
+async def get_candles(watch_id: str):
+    """Get candlestick data for chart rendering."""
+    watch = engine.watch_list.get(watch_id)
+    if not watch:
+        raise HTTPException(status_code=404, detail="Watch not found")
+    
+    candles = engine.get_candles(watch_id)
+    
+    # If no cached candles, fetch from IB
+    # 期貨用連續合約獲取歷史數據
+    if not candles and ib and ib.connected:
+        try:
+            duration, bar_size = get_timeframe_params(watch.timeframe)
+            hist_contract_month = "" if watch.sec_type == "FUT" else (watch.contract_month or None)
+            df = await ib.get_daily_bars(
+                symbol=watch.symbol,
+                sec_type=watch.sec_type,
+                exchange=watch.exchange,
+                currency=watch.currency,
+                duration=duration,
+                bar_size=bar_size,
+                contract_month=hist_contract_month,
+            )
+            if df is not None and len(df) > 0:
+                candles = CandleSeries.from_df(df)
+                engine._candles[watch_id] = candles
+        except Exception as e:
+            logger.warning("Failed to fetch candles for %s: %s", watch.symbol, e)
+    
+    threshold = engine.get_threshold(watch_id)
+    if not candles:
+        # Nothing to chart — same shape as a full payload, without the thread hop
+        is_bb = watch.strategy_type == "BB"
+        return {
+            "symbol": watch.symbol,
+            "candles": [],
+            "ma": [],
+            "ma_period": watch.ma_period,
+            "bb_upper": [] if is_bb else None,
+            "bb_lower": [] if is_bb else None,
+            "bb_std_dev": watch.bb_std_dev if is_bb else None,
+            "strategy_type": watch.strategy_type,
+            "confirm_ma": [] if watch.confirm_ma_enabled else None,
+            "confirm_ma_period": watch.confirm_ma_period if watch.confirm_ma_enabled else None,
+            "n_points": watch.n_points,
+            "direction": watch.direction,
+            "trigger_low": threshold.trigger_low if threshold else None,
+            "trigger_high": threshold.trigger_high if threshold else None,
+            "timeframe": watch.timeframe,
+        }
+
+    # Indicator math and the JSON encode run in a worker thread so a chart
+    # load doesn't stall the monitor loop or WebSocket traffic
+    payload = await asyncio.to_thread(_compute_chart_payload, watch_id, watch, candles, threshold)
+    return Response(content=payload, media_type="application/json")
 
 
 @app.get("/api/debug/options-cache")
@@ -1313,7 +1786,7 @@ async def debug_options_cache():
                 "expiry": o.get("expiry"), "strike": o.get("strike"),
                 "right": o.get("right"), "multiplier": o.get("multiplier"),
                 "tradingClass": o.get("tradingClass", ""),
-                "has_contract": o.get("_contract") is not None,
+                "has_contract": ib.has_option_contract(o.get("conId")),
                 "bid": o.get("bid"), "ask": o.get("ask"), "last": o.get("last"),
             })
         result[f"{sym}_{watch_id}"] = items
@@ -1326,6 +1799,8 @@ async def get_options(symbol: str, right: str = "C", ma_price: float = 0, sec_ty
     if DEMO_MODE:
         return _demo_options(symbol.upper(), right, ma_price, num_strikes)
     options = await ib.get_option_chain(symbol.upper(), sec_type, exchange, currency, ma_price, right, num_strikes)
+    # Ad-hoc lookups aren't cached chains; don't keep their contracts around
+    _prune_option_contracts()
     return options
 
 
@@ -1353,23 +1828,17 @@ async def refresh_watch_options(watch_id: str):
     if ma_price <= 0:
         return {"error": "No MA/BB data yet"}
     
-    # Re-fetch contracts based on current MA
-    await cache_options_for_watch(watch_id, watch, ma_price)
+    # Re-fetch contracts based on current MA (quotes are fetched once, below)
+    await cache_options_for_watch(watch_id, watch, ma_price, fetch_prices=False)
     
     # Refresh prices
     cache = _options_cache.get(watch_id)
     if cache:
-        if cache.get("call_raw"):
-            await ib.refresh_option_prices(cache["call_raw"])
-            cache["call"] = _group_options(cache["call_raw"])
-        if cache.get("put_raw"):
-            await ib.refresh_option_prices(cache["put_raw"])
-            cache["put"] = _group_options(cache["put_raw"])
-        
-        data["options_call"] = cache.get("call", {})
-        data["options_put"] = cache.get("put", {})
-        data["locked_ma"] = ma_price
-        
+        await _refresh_option_quotes(cache["call_raw"], cache["put_raw"])
+        _encode_options(cache)
+
+        data = {**data, "options_call": cache.get("call", {}), "options_put": cache.get("put", {}),
+                "locked_ma": ma_price}
         await broadcast({"type": "data_update", "watch_id": watch_id, "data": data})
     
     total = len(cache.get("call_raw", [])) + len(cache.get("put_raw", []))
@@ -1387,31 +1856,19 @@ async def update_option_prices(watch_id: str, expiry: Optional[str] = None):
 
     if expiry:
         # Refresh only the specified expiry's options (fast — ~5 contracts)
-        call_subset = [o for o in cache.get("call_raw", []) if o["expiry"] == expiry]
-        put_subset = [o for o in cache.get("put_raw", []) if o["expiry"] == expiry]
-        if call_subset:
-            await ib.refresh_option_prices(call_subset)
-        if put_subset:
-            await ib.refresh_option_prices(put_subset)
-        # Regroup all (includes freshly updated subset)
-        if cache.get("call_raw"):
-            cache["call"] = _group_options(cache["call_raw"])
-        if cache.get("put_raw"):
-            cache["put"] = _group_options(cache["put_raw"])
+        call_subset = cache["call_by_expiry"].get(expiry, [])
+        put_subset = cache["put_by_expiry"].get(expiry, [])
+        await _refresh_option_quotes(call_subset, put_subset)
+        _encode_options(cache)
         refreshed = len(call_subset) + len(put_subset)
         logger.info("Refreshed prices for %s expiry %s (%d contracts)", watch_id, expiry, refreshed)
     else:
         # Refresh all expirations
-        if cache.get("call_raw"):
-            await ib.refresh_option_prices(cache["call_raw"])
-            cache["call"] = _group_options(cache["call_raw"])
-        if cache.get("put_raw"):
-            await ib.refresh_option_prices(cache["put_raw"])
-            cache["put"] = _group_options(cache["put_raw"])
+        await _refresh_option_quotes(cache["call_raw"], cache["put_raw"])
+        _encode_options(cache)
 
-    data = engine.latest_data.get(watch_id, {})
-    data["options_call"] = cache.get("call", {})
-    data["options_put"] = cache.get("put", {})
+    data = {**engine.latest_data.get(watch_id, {}),
+            "options_call": cache.get("call", {}), "options_put": cache.get("put", {})}
 
     await broadcast({"type": "data_update", "watch_id": watch_id, "data": data})
     return {"ok": True, "expiry": expiry}
@@ -1431,15 +1888,16 @@ async def place_order(req: OrderRequest):
 
     # Look up multiplier from options cache
     opt_cache = _options_cache.get(req.watch_id, {})
-    cached_opts = (opt_cache.get("call_raw") or []) + (opt_cache.get("put_raw") or [])
-    multiplier_map = {o.get("conId"): o.get("multiplier", 100) for o in cached_opts if o.get("conId")}
+    multiplier_map = opt_cache.get("multiplier_map", {})
 
     # Also include underlying contract info for direct futures trading
     underlying_info = ib.get_underlying_info(req.watch_id)
     if underlying_info and underlying_info.get("conId"):
-        multiplier_map[underlying_info["conId"]] = underlying_info.get("multiplier", 1)
+        # Copy rather than add to the cached map
+        multiplier_map = {**multiplier_map, underlying_info["conId"]: underlying_info.get("multiplier", 1)}
 
     results = []
+    legs = []  # (index into results, conId, qty)
     for item in req.items:
         con_id = item.get("conId")
         ask = item.get("ask", 0)
@@ -1453,14 +1911,17 @@ async def place_order(req: OrderRequest):
         # For underlying futures, use the item's multiplier if provided
         multiplier = item.get("multiplier") or multiplier_map.get(con_id, 100)
         qty = max(1, int(amount / (ask * multiplier)))
-
-        # Determine action: BUY for calls/puts entry
-        action = "BUY"
-
-        order_result = await ib.place_market_order(con_id, action, qty)
-        order_result["qty_requested"] = qty
-        order_result["conId"] = con_id
-        results.append(order_result)
+        legs.append((len(results), con_id, qty))
+        results.append(None)
+
+    # Determine action: BUY for calls/puts entry — all legs go out in one batch
+    action = "BUY"
+    if legs:
+        order_results = await ib.place_market_orders([(con_id, action, qty) for _, con_id, qty in legs])
+        for (i, con_id, qty), order_result in zip(legs, order_results):
+            order_result["qty_requested"] = qty
+            order_result["conId"] = con_id
+            results[i] = order_result
 
     # Create active trade record
     trade_id = str(uuid.uuid4())[:8]
@@ -1473,7 +1934,7 @@ async def place_order(req: OrderRequest):
         "exit": req.exit,
         "status": "filled",
     }
-    _active_trades[trade_id] = trade
+    _store_trade(trade)
 
     # If limit exit enabled, place limit orders for each filled order
     exit_cfg = req.exit
@@ -1482,12 +1943,12 @@ async def place_order(req: OrderRequest):
         limit_dir = exit_cfg["limit"].get("dir", "+")
         limit_pts = float(exit_cfg["limit"].get("pts", 0.5))
         limit_unit = exit_cfg["limit"].get("unit", "pts")  # 'pts' or 'pct'
+        limit_legs = []
         for r in results:
             if r.get("status") in ("Filled", "PreSubmitted", "Submitted") and r.get("avgFillPrice", 0) > 0:
                 fill_price = r["avgFillPrice"]
                 if limit_unit == "pct":
                     # Percentage: e.g., +50% means fill_price * 1.5, round up
-                    import math
                     if limit_dir == "+":
                         limit_price = math.ceil(fill_price * (1 + limit_pts / 100))
                     else:
@@ -1498,9 +1959,14 @@ async def place_order(req: OrderRequest):
                         limit_price = round(fill_price + limit_pts, 2)
                     else:
                         limit_price = round(fill_price - limit_pts, 2)
-                limit_result = await ib.place_limit_order(r["conId"], "SELL", r.get("qty_requested", 1), limit_price)
+                limit_legs.append((r, limit_price))
+        if limit_legs:
+            limit_results = await ib.place_limit_orders([
+                (r["conId"], "SELL", r.get("qty_requested", 1), px) for r, px in limit_legs
+            ])
+            for (r, _), limit_result in zip(limit_legs, limit_results):
                 r["exit_limit_order"] = limit_result
-                has_limit_exit = True
+            has_limit_exit = True
     
     # Update status based on whether limit exit orders were placed
     if has_limit_exit:
@@ -1517,6 +1983,18 @@ async def get_trades():
     return list(_active_trades.values())
 
 
+@app.get("/api/trades/history")
+async def get_trade_history(limit: int = 100):
+    """Get closed trades from the trade log, newest first."""
+    if not TRADE_LOG_FILE.exists():
+        return []
+    raw = await asyncio.to_thread(TRADE_LOG_FILE.read_bytes)
+    lines = [line for line in raw.splitlines() if line.strip()]
+    if limit > 0:
+        lines = lines[-limit:]
+    return [orjson.loads(line) for line in reversed(lines)]
+
+
 @app.post("/api/trades/{trade_id}/close")
 async def close_trade(trade_id: str):
     """Manually close a trade by selling all positions."""
@@ -1533,20 +2011,21 @@ async def close_trade(trade_id: str):
 
     trade["status"] = "exiting"
     close_results = []
-    for order_info in trade["orders"]:
-        if order_info.get("conId") and order_info.get("qty_requested"):
-            try:
-                # Cancel any existing limit exit orders first
-                exit_limit = order_info.get("exit_limit_order", {})
-                if exit_limit.get("orderId"):
-                    await ib.cancel_order(exit_limit["orderId"])
-
-                close_result = await ib.place_market_order(order_info["conId"], "SELL", order_info["qty_requested"])
+    legs = [o for o in trade["orders"] if o.get("conId") and o.get("qty_requested")]
+    if legs:
+        try:
+            # Cancel any existing limit exit orders first, then sell every leg in one batch
+            limit_ids = [o.get("exit_limit_order", {}).get("orderId") for o in legs]
+            limit_ids = [oid for oid in limit_ids if oid]
+            if limit_ids:
+                await ib.cancel_orders(limit_ids)
+
+            close_results = await ib.place_market_orders([(o["conId"], "SELL", o["qty_requested"]) for o in legs])
+            for order_info, close_result in zip(legs, close_results):
                 order_info["close_order"] = close_result
-                close_results.append(close_result)
-            except Exception as e:
-                logger.error("Close order failed for trade %s: %s", trade_id, e)
-                close_results.append({"error": str(e)})
+        except Exception as e:
+            logger.error("Close order failed for trade %s: %s", trade_id, e)
+            close_results = [{"error": str(e)} for _ in legs]
 
     await _close_trade_and_reset(trade, "手動平倉")
     logger.info("Trade %s manually closed", trade_id)
@@ -1555,18 +2034,19 @@ async def close_trade(trade_id: str):
 
 def _demo_options(symbol: str, right: str, ma_price: float, num_strikes: int = 5):
     """Generate demo option data."""
-    import random
-    options = []
+    n = num_strikes
     base_strike = round(ma_price / 5) * 5  # round to nearest 5
-    for i in range(num_strikes):
-        if right == "C":
-            strike = base_strike + (i + 1) * 5
-        else:
-            strike = base_strike - (i + 1) * 5
-        bid = round(random.uniform(1.5, 15.0), 2)
-        ask = round(bid + random.uniform(0.1, 0.5), 2)
-        options.append({
-            "conId": random.randint(100000, 999999),
+    offsets = np.arange(1, n + 1) * 5
+    strikes = base_strike + offsets if right == "C" else base_strike - offsets
+    # One draw per field for all strikes
+    bids = np.round(_demo_rng.uniform(1.5, 15.0, n), 2)
+    asks = np.round(bids + _demo_rng.uniform(0.1, 0.5, n), 2)
+    lasts = np.round((bids + asks) / 2, 2)
+    con_ids = _demo_rng.integers(100000, 1000000, n)
+    volumes = _demo_rng.integers(100, 5001, n)
+    return [
+        {
+            "conId": con_id,
             "symbol": symbol,
             "expiry": "20260220",
             "strike": float(strike),
@@ -1574,67 +2054,86 @@ def _demo_options(symbol: str, right: str, ma_price: float, num_strikes: int = 5
             "name": f"{symbol} 20260220 {strike} {right}",
             "bid": bid,
             "ask": ask,
-            "last": round((bid + ask) / 2, 2),
-            "volume": random.randint(100, 5000),
-        })
-    return options
+            "last": last,
+            "volume": volume,
+        }
+        for strike, bid, ask, last, con_id, volume in zip(
+            strikes.tolist(), bids.tolist(), asks.tolist(), lasts.tolist(), con_ids.tolist(), volumes.tolist())
+    ]
 
 
 # --- Demo monitor loop ---
+# Set to cut the demo loop's 10s wait short (e.g. a watch was added or resumed)
+_demo_wake: Optional[asyncio.Event] = None
+
+
+def wake_demo_monitor():
+    """Run the next demo pass now instead of at the end of the current wait."""
+    if _demo_wake is not None:
+        _demo_wake.set()
+
+
 async def demo_monitor_loop():
     """Demo mode monitor — simulates price movements and signals."""
-    import random
+    global _demo_wake
     logger.info("Demo monitor loop started")
+    _demo_wake = asyncio.Event()
+    # Demo account data never changes — encode its frame once
+    account_frame = orjson.dumps({
+        "type": "account",
+        "summary": DEMO_ACCOUNT,
+        "positions": DEMO_POSITIONS,
+        "orders": [],
+        "connected": True,
+    }, option=_WS_JSON_OPTS)
 
     while engine.running:
         try:
-            for watch_id, watch in list(engine.watch_list.items()):
-                if not watch.enabled or not engine.running:
+            updates = []  # one batch_update frame per pass, same as the live loop
+            now_iso = datetime.now().isoformat()  # one timestamp for the whole pass
+            # _enabled_watches is rebound, never mutated, so this is a stable snapshot
+            watches = list(engine._enabled_watches.items())
+            # Simulate price and MA data for every watch in one draw per quantity
+            n = len(watches)
+            bases = np.array([DEMO_BASE_PRICES.get(w.symbol, 100) for _, w in watches], dtype=np.float64)
+            prices = np.round(bases + _demo_rng.uniform(-0.5, 0.5, n) * bases * 0.01, 2)
+            mas = np.round(bases - bases * 0.005 + _demo_rng.uniform(-0.3, 0.3, n) * bases * 0.005, 4)
+            prev_mas = np.round(mas - _demo_rng.uniform(-0.5, 0.5, n), 4)
+            fires = _demo_rng.random(n) < 0.05
+            for (watch_id, watch), current_price, ma_value, prev_ma, fire in zip(
+                    watches, prices.tolist(), mas.tolist(), prev_mas.tolist(), fires.tolist()):
+                if not engine.running:
                     continue
 
-                # Simulate price and MA data
-                base_price = {"SPY": 602, "QQQ": 520, "AAPL": 235, "MSFT": 420,
-                              "NVDA": 880, "MNQ": 21500, "MES": 6050, "TSLA": 390}.get(watch.symbol, 100)
-                noise = random.uniform(-0.5, 0.5) * base_price * 0.01
-                current_price = round(base_price + noise, 2)
-
-                ma_noise = random.uniform(-0.3, 0.3) * base_price * 0.005
-                ma_value = round(base_price - base_price * 0.005 + ma_noise, 4)
-                prev_ma = round(ma_value - random.uniform(-0.5, 0.5), 4)
                 ma_rising = ma_value > prev_ma
                 distance = round(current_price - ma_value, 4)
 
                 engine.latest_data[watch_id] = {
                     "symbol": watch.symbol,
                     "current_price": current_price,
-                    "ma_value": round(ma_value, 4),
-                    "prev_ma": round(prev_ma, 4),
+                    "ma_value": ma_value,
+                    "prev_ma": prev_ma,
                     "ma_period": watch.ma_period,
                     "ma_direction": "RISING" if ma_rising else "FALLING",
                     "n_points": watch.n_points,
                     "distance_from_ma": distance,
                     "buy_zone": f"{round(ma_value, 2)} ~ {round(ma_value + watch.n_points, 2)}" if ma_rising else None,
                     "sell_zone": f"{round(ma_value - watch.n_points, 2)} ~ {round(ma_value, 2)}" if not ma_rising else None,
-                    "last_updated": datetime.now().isoformat(),
+                    "last_updated": now_iso,
                 }
 
-                await broadcast({
-                    "type": "data_update",
-                    "watch_id": watch_id,
-                    "data": engine.latest_data[watch_id],
-                })
+                updates.append({"watch_id": watch_id, "data": engine.latest_data[watch_id]})
 
                 # Occasionally trigger a demo signal (5% chance)
-                if random.random() < 0.05:
-                    from strategy import Signal, SignalType
+                if fire:
                     sig_type = SignalType.BUY if ma_rising else SignalType.SELL
                     signal = Signal(
-                        timestamp=datetime.now().isoformat(),
+                        timestamp=now_iso,
                         watch_id=watch_id,
                         symbol=watch.symbol,
                         signal_type=sig_type,
                         price=current_price,
-                        ma_value=round(ma_value, 4),
+                        ma_value=ma_value,
                         ma_period=watch.ma_period,
                         n_points=watch.n_points,
                         distance=abs(distance),
@@ -1653,21 +2152,20 @@ async def demo_monitor_loop():
                         },
                     })
 
-                await asyncio.sleep(0.5)
+            if updates:
+                await broadcast({"type": "batch_update", "updates": updates})
 
-            # Broadcast demo account
-            await broadcast({
-                "type": "account",
-                "summary": DEMO_ACCOUNT,
-                "positions": DEMO_POSITIONS,
-                "orders": [],
-                "connected": True,
-            })
+            # Broadcast demo account — constant, so each client gets it once
+            await broadcast_raw(account_frame, dedupe_key="account")
 
         except Exception as e:
             logger.error("Demo monitor error: %s", e)
 
-        await asyncio.sleep(10)
+        try:
+            await asyncio.wait_for(_demo_wake.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            pass
+        _demo_wake.clear()
 
     logger.info("Demo monitor loop stopped")
 
@@ -1675,17 +2173,21 @@ async def demo_monitor_loop():
 # --- WebSocket ---
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
+    global ws_clients
     await ws.accept()
-    ws_clients.add(ws)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+    state = ClientState(queue=queue, writer=asyncio.create_task(_ws_writer(ws, queue)))
+    ws_clients = {**ws_clients, ws: state}
     logger.info("WebSocket client connected (total: %d)", len(ws_clients))
     try:
-        # Send initial state (include cached options in latest_data)
-        latest = engine.get_latest_data()
-        for wid, data in latest.items():
-            if wid in _options_cache:
-                data["options_call"] = _options_cache[wid]["call"]
-                data["options_put"] = _options_cache[wid]["put"]
-                data["locked_ma"] = _options_cache[wid]["ma_price"]
+        # Send initial state (cached options merged into copies of latest_data)
+        latest = {}
+        for wid, data in engine.get_latest_data().items():
+            opts = _options_cache.get(wid)
+            latest[wid] = data if opts is None else {
+                **data, "options_call": opts["call"], "options_put": opts["put"], "locked_ma": opts["ma_price"]}
+            if opts is not None:
+                state.options_sent[wid] = opts["options_version"]
 
         init_msg = {
             "type": "init",
@@ -1695,36 +2197,43 @@ async def websocket_endpoint(ws: WebSocket):
             "signals": engine.get_signals(20),
             "latest_data": latest,
         }
-        await ws.send_text(json.dumps(init_msg, default=str))
+        # Everything goes through the queue so frames from here and broadcasts stay ordered
+        _enqueue(state, orjson.dumps(init_msg, default=str, option=_WS_JSON_OPTS))
         
         # Send account data if connected
         if not DEMO_MODE and ib and ib.connected:
             try:
-                account = await ib.get_account_summary()
-                positions = await ib.get_positions()
-                orders = await ib.get_open_orders()
-                await ws.send_text(json.dumps({
+                account, positions, orders = await ib.get_account_snapshot()
+                _enqueue(state, orjson.dumps({
                     "type": "account",
                     "summary": account,
                     "positions": positions,
                     "orders": orders,
                     "connected": True,
-                }, default=str))
+                }, default=str, option=_WS_JSON_OPTS))
             except Exception:
                 pass
 
         while True:
-            data = await ws.receive_text()
+            frame = await ws.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            raw = frame.get("bytes") or (frame.get("text") or "").encode()
+            # Keepalive pings are nearly all the inbound traffic — answer them unparsed
+            if raw == b'{"type":"ping"}':
+                _enqueue(state, b'{"type":"pong"}')
+                continue
             # Handle client messages if needed
-            msg = json.loads(data)
+            msg = orjson.loads(raw)
             if msg.get("type") == "ping":
-                await ws.send_text(json.dumps({"type": "pong"}))
+                _enqueue(state, b'{"type":"pong"}')
     except WebSocketDisconnect:
         pass
     except Exception as e:
         logger.error("WebSocket error: %s", e)
     finally:
-        ws_clients.discard(ws)
+        ws_clients = {c: st for c, st in ws_clients.items() if c is not ws}
+        state.writer.cancel()
         logger.info("WebSocket client disconnected (total: %d)", len(ws_clients))
 
 
@@ -1739,7 +2248,9 @@ app.mount("/static", StaticFiles(directory=Path(__file__).parent / "static"), na
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8888)
+    # uvloop (picked by "auto" when installed) can't be patched by nest_asyncio,
+    # which ib_insync needs — only use it in demo mode
+    uvicorn.run(app, host="0.0.0.0", port=8888, loop="auto" if DEMO_MODE else "asyncio")
 
 
 @app.get("/api/debug/prices")
@@ -0,0 +1,40 @@
+"""Test setup: import app in demo mode (no IB connection) with auth off; kernel fixtures."""
+import importlib
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("DEMO_MODE", "true")
+os.environ.setdefault("AUTH_ENABLED", "false")
+
+
+KERNEL_PATHS = {
+    "numba": (),
+    "bottleneck": ("numba",),
+    "loops": ("numba", "bottleneck"),
+}
+
+
+@pytest.fixture(params=list(KERNEL_PATHS))
+def kernels(request, monkeypatch):
+    """strategy_kernels as imported with numba and/or bottleneck hidden.
+
+    Runs each test once per implementation: numba JIT, bottleneck (no numba)
+    and the plain Python loops. Skips paths whose package isn't installed.
+    """
+    path = request.param
+    if path != "loops":
+        pytest.importorskip(path)
+    if path == "numba":
+        # The real module: numba's on-disk cache is keyed to it, not to a renamed copy
+        return importlib.import_module("strategy_kernels")
+    for name in KERNEL_PATHS[path]:
+        monkeypatch.setitem(sys.modules, name, None)  # makes the import raise ImportError
+    spec = importlib.util.spec_from_file_location(
+        f"_strategy_kernels_{path}", Path(__file__).parent / "strategy_kernels.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -138,9 +138,13 @@ async function logout() {
 }
 
 // ─── WebSocket ───
+const wsTextDecoder = new TextDecoder();
+
 function connectWS() {
     const proto = location.protocol === 'https:' ? 'wss' : 'ws';
     ws = new WebSocket(`${proto}://${location.host}/ws`);
+    // Server frames arrive as binary (UTF-8 JSON); decode synchronously
+    ws.binaryType = 'arraybuffer';
 
     ws.onopen = () => {
         log('WebSocket 已連線', 'success');
@@ -153,7 +157,8 @@ function connectWS() {
     };
 
     ws.onmessage = (e) => {
-        const msg = JSON.parse(e.data);
+        const text = typeof e.data === 'string' ? e.data : wsTextDecoder.decode(e.data);
+        const msg = JSON.parse(text);
         handleMessage(msg);
     };
 
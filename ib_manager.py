@@ -1,149 +1,171 @@
 """IB Connection Manager — handles TWS connection, market data, account info, and option chains.
 
 Architecture:
-  - Single-threaded executor for all IB operations (ib_insync is not thread-safe)
-  - Thread-local IB instance with delayed data (type 3)
+  - One IB instance on the app's event loop, driven through ib_insync's *Async
+    API, so independent requests (bars, chains, snapshots) overlap
+  - Delayed data (type 3)
   - Streaming price subscriptions: subscribe once, read cached ticker values
   - Account summary: persistent subscription (avoids Error 322)
 """
 
 import asyncio
 import logging
-import math
-import threading
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 from typing import Optional, Dict, List, Any, Tuple
-from concurrent.futures import ThreadPoolExecutor
 
-from ib_insync import IB, Contract, Stock, Future, ContFuture, Option, Index, MarketOrder, LimitOrder, util
+from ib_insync import IB, Contract, Stock, Future, ContFuture, Option, Index, MarketOrder, LimitOrder
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
-# Thread-local storage for IB instance
-_thread_local = threading.local()
+# Option chain definitions (expirations/strikes) are reused for this long
+OPTION_CHAIN_TTL = 3600  # seconds
 
-
-def _get_ib(host, port, client_id) -> IB:
-    """Get or create thread-local IB instance."""
-    if not hasattr(_thread_local, 'ib') or _thread_local.ib is None:
-        _thread_local.ib = IB()
-    ib = _thread_local.ib
-    if not ib.isConnected():
-        try:
-            ib.connect(host, port, clientId=client_id, timeout=10)
-            ib.reqMarketDataType(3)  # Delayed data
-            logger.info("IB connected in thread %s", threading.current_thread().name)
-        except Exception as e:
-            logger.error("IB connect error: %s", e)
-    return ib
-
-
-# Single thread executor - all IB ops run here
-_ib_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ib_")
+# Order statuses that mean IB has acknowledged (or finished with) an order
+_ACKED_STATUSES = {"PreSubmitted", "Submitted", "Filled", "Cancelled", "ApiCancelled", "Inactive"}
 
 # Streaming price subscriptions: watch_id -> (Contract, Ticker)
 _subscriptions: Dict[str, Tuple[Contract, Any]] = {}
+# (watch_id, ticker) pairs read every tick; rebuilt only when subscriptions change
+_sub_tickers: Tuple[Tuple[str, Any], ...] = ()
+
+
+def _rebuild_sub_tickers():
+    global _sub_tickers
+    _sub_tickers = tuple((watch_id, ticker) for watch_id, (_, ticker) in _subscriptions.items())
 
 # Account summary subscription state
 _account_subscribed = False
 
 
+def _has_quote(ticker) -> bool:
+    """True once a snapshot ticker has both sides of the quote (or a last trade)."""
+    bid, ask, last = ticker.bid, ticker.ask, ticker.last
+    return (bid == bid and ask == ask and bid > 0 and ask > 0) or (last == last and last > 0)
+
+
+def _bars_to_df(bars) -> pd.DataFrame:
+    """OHLCV DataFrame indexed by bar date, built column by column.
+
+    Skips util.df's per-bar record conversion and the date re-parse; columns
+    stay float64 because that is what the strategy kernels consume.
+    """
+    n = len(bars)
+    columns = {
+        name: np.fromiter((getattr(b, name) for b in bars), dtype=np.float64, count=n)
+        for name in ("open", "high", "low", "close", "volume")
+    }
+    index = pd.DatetimeIndex(pd.to_datetime([b.date for b in bars]), name="date")
+    return pd.DataFrame(columns, index=index)
+
+
+async def _next_emit(event):
+    """Await an eventkit Event's next emit (as a coroutine, so it can take a timeout)."""
+    return await event
+
+
 class IBManager:
     def __init__(self, host: str = "127.0.0.1", port: int = 7496, client_id: int = 10):
         self.host = host
         self.port = port
         self.client_id = client_id
         self._connected = False
-
-    def _get_ib(self) -> IB:
-        return _get_ib(self.host, self.port, self.client_id)
+        self.ib = IB()
+        self._connect_lock: Optional[asyncio.Lock] = None  # created on the running loop
+        self._account_lock: Optional[asyncio.Lock] = None  # serializes the first summary request
+        # conId -> qualified option Contract; kept here so the option dicts handed
+        # to app.py stay plain JSON and can be shared without copying
+        self._option_contracts: Dict[int, Contract] = {}
+        # (symbol, sec_type, exchange, currency, contract_month, use_contfut) ->
+        # (day qualified, Contract); re-qualified daily so continuous futures roll
+        self._qualified: Dict[Tuple, Tuple[date, Contract]] = {}
+        # conId -> Contract qualified by conId (conIds never change meaning)
+        self._contracts_by_conid: Dict[int, Contract] = {}
+        # (symbol, exchange, underlying conId) -> (monotonic fetch time, option chains)
+        self._chain_cache: Dict[Tuple[str, str, int], Tuple[float, list]] = {}
 
     @property
     def connected(self) -> bool:
-        # Check in executor thread
-        try:
-            future = _ib_executor.submit(lambda: _get_ib(self.host, self.port, self.client_id).isConnected())
-            return future.result(timeout=5)
-        except:
-            return False
-
-    def _sync_connect(self):
-        """Synchronous connection."""
-        ib = self._get_ib()
-        return ib.isConnected()
+        return self.ib.isConnected()
 
     async def connect(self) -> bool:
-        """Connect to IB TWS/Gateway."""
-        try:
+        """Connect to IB TWS/Gateway (concurrent callers share one attempt)."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
             if self.connected:
                 return True
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(_ib_executor, self._sync_connect)
-            self._connected = result
-            if result:
+            global _account_subscribed
+            try:
+                await self.ib.connectAsync(self.host, self.port, clientId=self.client_id, timeout=10)
+                self.ib.reqMarketDataType(3)  # Delayed data
+                _account_subscribed = False  # subscriptions die with the old connection
+                self._connected = True
                 logger.info("Connected to IB TWS at %s:%s (delayed data mode)", self.host, self.port)
-            return result
-        except Exception as e:
-            logger.error("IB connection failed: %s", e)
-            self._connected = False
-            return False
+                return True
+            except Exception as e:
+                logger.error("IB connection failed: %s", e)
+                self._connected = False
+                return False
 
     async def disconnect(self):
-        def do_disconnect():
-            ib = self._get_ib()
-            if ib.isConnected():
-                ib.disconnect()
         if self.connected:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(_ib_executor, do_disconnect)
+            self.ib.disconnect()
             self._connected = False
             logger.info("Disconnected from IB")
 
-    def _sync_get_account_summary(self) -> Dict[str, Any]:
-        """Synchronous account summary fetch.
+    async def get_account_summary(self) -> Dict[str, Any]:
+        """Get account balance, equity, buying power, etc.
 
         Uses persistent subscription to avoid Error 322 (max account summary requests).
-        First call subscribes; subsequent calls just read cached data.
+        First call subscribes and waits for the initial data; later calls read the
+        values ib_insync keeps up to date.
         """
         global _account_subscribed
-        ib = self._get_ib()
-
-        if not _account_subscribed:
-            ib.reqAccountSummary()
-            _account_subscribed = True
-            util.sleep(1)  # Wait for initial data
-        else:
-            ib.sleep(0.1)  # Process pending events to get latest data
-
-        summary = ib.accountSummary()
-        result = {}
-        for item in summary:
-            result[item.tag] = {
-                "value": item.value,
-                "currency": item.currency,
-            }
-        return result
-
-    async def get_account_summary(self) -> Dict[str, Any]:
-        """Get account balance, equity, buying power, etc."""
         try:
             if not self.connected:
                 return {"error": "Not connected"}
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(_ib_executor, self._sync_get_account_summary)
+            if not _account_subscribed:
+                if self._account_lock is None:
+                    self._account_lock = asyncio.Lock()
+                # Concurrent first callers wait for the one request instead of reading an empty summary
+                async with self._account_lock:
+                    if not _account_subscribed:
+                        await self.ib.reqAccountSummaryAsync()
+                        _account_subscribed = True
+
+            result = {}
+            for item in self.ib.accountSummary():
+                result[item.tag] = {
+                    "value": item.value,
+                    "currency": item.currency,
+                }
+            return result
         except Exception as e:
             logger.error("Failed to get account summary: %s", e)
             return {"error": str(e)}
 
-    def _sync_get_positions(self) -> List[Dict[str, Any]]:
-        """Synchronous positions fetch."""
-        ib = self._get_ib()
-        positions = ib.positions()
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        """Get current positions (read from ib_insync's live cache — no request)."""
+        try:
+            if not self.connected:
+                return []
+            return self._positions()
+        except Exception as e:
+            logger.error("Failed to get positions: %s", e)
+            return []
+
+    def _positions(self) -> List[Dict[str, Any]]:
+        ib = self.ib
+        # Market values come from the portfolio, matched by conId (a symbol can
+        # cover the stock and its options, so it is not a safe key)
+        port_by_conid = {p.contract.conId: p for p in ib.portfolio()}
         result = []
-        for pos in positions:
+        for pos in ib.positions():
             c = pos.contract
-            result.append({
+            item = {
                 "conId": c.conId,
                 "symbol": c.symbol,
                 "secType": c.secType,
@@ -157,38 +179,16 @@ class IBManager:
                 "marketValue": None,
                 "marketPrice": None,
                 "unrealizedPNL": None,
-            })
-        # Use portfolio directly for market values (more reliable matching by conId)
-        portfolio = ib.portfolio()
-        port_map = {}
-        for p in portfolio:
-            port_map[p.contract.conId] = {
-                "marketPrice": float(p.marketPrice) if p.marketPrice else None,
-                "marketValue": float(p.marketValue) if p.marketValue else None,
-                "unrealizedPNL": float(p.unrealizedPNL) if p.unrealizedPNL is not None else None,
-                "realizedPNL": float(p.realizedPNL) if p.realizedPNL is not None else None,
             }
-            # Also map by symbol as fallback
-            port_map[p.contract.symbol] = port_map[p.contract.conId]
-        
-        for item in result:
-            # Try conId first, then symbol
-            pdata = port_map.get(item.get("conId")) or port_map.get(item["symbol"])
-            if pdata:
-                item.update(pdata)
+            p = port_by_conid.get(c.conId)
+            if p is not None:
+                item["marketPrice"] = float(p.marketPrice) if p.marketPrice else None
+                item["marketValue"] = float(p.marketValue) if p.marketValue else None
+                item["unrealizedPNL"] = float(p.unrealizedPNL) if p.unrealizedPNL is not None else None
+                item["realizedPNL"] = float(p.realizedPNL) if p.realizedPNL is not None else None
+            result.append(item)
         return result
 
-    async def get_positions(self) -> List[Dict[str, Any]]:
-        """Get current positions."""
-        try:
-            if not self.connected:
-                return []
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(_ib_executor, self._sync_get_positions)
-        except Exception as e:
-            logger.error("Failed to get positions: %s", e)
-            return []
-
     def _make_contract(self, symbol: str, sec_type: str = "STK", exchange: str = "SMART", 
                        currency: str = "USD", contract_month: str = "",
                        use_contfut: bool = False) -> Contract:
@@ -212,33 +212,20 @@ class IBManager:
         else:
             return Contract(symbol=symbol, secType=sec_type, exchange=exchange, currency=currency)
 
-    def _sync_get_daily_bars(self, symbol: str, sec_type: str, exchange: str, currency: str, 
-                               duration: str, bar_size: str, contract_month: str = "") -> Optional[pd.DataFrame]:
-        """Synchronous daily bars fetch."""
-        ib = self._get_ib()
-        # Use ContFut for futures with no contract_month (continuous contract for long history)
-        use_contfut = (sec_type == "FUT" and not contract_month)
+    async def _qualify(self, symbol: str, sec_type: str, exchange: str, currency: str,
+                       contract_month: str = "", use_contfut: bool = False) -> Optional[Contract]:
+        """Qualified contract for these fields; TWS is asked at most once a day per contract."""
+        key = (symbol, sec_type, exchange, currency, contract_month, use_contfut)
+        today = date.today()
+        hit = self._qualified.get(key)
+        if hit is not None and hit[0] == today:
+            return hit[1]
         contract = self._make_contract(symbol, sec_type, exchange, currency, contract_month, use_contfut=use_contfut)
-        qualified = ib.qualifyContracts(contract)
+        qualified = await self.ib.qualifyContractsAsync(contract)
         if not qualified:
-            logger.error("Could not qualify contract: %s", symbol)
-            return None
-        contract = qualified[0]
-        bars = ib.reqHistoricalData(
-            contract,
-            endDateTime="",
-            durationStr=duration,
-            barSizeSetting=bar_size,
-            whatToShow="TRADES",
-            useRTH=True,
-            formatDate=1,
-        )
-        if not bars:
             return None
-        df = util.df(bars)
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        return df
+        self._qualified[key] = (today, qualified[0])
+        return qualified[0]
 
     async def get_daily_bars(self, symbol: str, sec_type: str = "STK", exchange: str = "SMART",
                              currency: str = "USD", duration: str = "6 M", bar_size: str = "1 day",
@@ -247,79 +234,92 @@ class IBManager:
         try:
             if not self.connected:
                 return None
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                _ib_executor, 
-                lambda: self._sync_get_daily_bars(symbol, sec_type, exchange, currency, duration, bar_size, contract_month)
+            # Use ContFut for futures with no contract_month (continuous contract for long history)
+            use_contfut = (sec_type == "FUT" and not contract_month)
+            contract = await self._qualify(symbol, sec_type, exchange, currency, contract_month, use_contfut)
+            if not contract:
+                logger.error("Could not qualify contract: %s", symbol)
+                return None
+            bars = await self.ib.reqHistoricalDataAsync(
+                contract,
+                endDateTime="",
+                durationStr=duration,
+                barSizeSetting=bar_size,
+                whatToShow="TRADES",
+                useRTH=True,
+                formatDate=1,
             )
+            if not bars:
+                return None
+            return _bars_to_df(bars)
         except Exception as e:
             logger.error("Failed to get daily bars for %s: %s", symbol, e)
             return None
 
-    def _sync_get_current_price(self, symbol: str, sec_type: str, exchange: str, currency: str,
-                                contract_month: str = "") -> Optional[float]:
-        """Synchronous price fetch."""
-        ib = self._get_ib()
-        contract = self._make_contract(symbol, sec_type, exchange, currency, contract_month)
-        qualified = ib.qualifyContracts(contract)
-        if not qualified:
-            return None
-        contract = qualified[0]
-        ticker = ib.reqMktData(contract, "", False, False)
-        util.sleep(2)
-        ib.cancelMktData(contract)
-        price = ticker.last if ticker.last and ticker.last > 0 else ticker.close
-        return float(price) if price and price > 0 else None
-
     async def get_current_price(self, symbol: str, sec_type: str = "STK", exchange: str = "SMART",
                                  currency: str = "USD", contract_month: str = "") -> Optional[float]:
         """Get the current/last price for a symbol."""
         try:
             if not self.connected:
                 return None
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                _ib_executor,
-                lambda: self._sync_get_current_price(symbol, sec_type, exchange, currency, contract_month)
-            )
+            contract = await self._qualify(symbol, sec_type, exchange, currency, contract_month)
+            if not contract:
+                return None
+            # Snapshot: returns as soon as IB ends it instead of a fixed 2s stream
+            ticker = (await self.ib.reqTickersAsync(contract))[0]
+            price = ticker.last if ticker.last and ticker.last > 0 else ticker.close
+            return float(price) if price and price > 0 else None
         except Exception as e:
             logger.error("Failed to get price for %s: %s", symbol, e)
             return None
 
     # ─── Option Chain (2-step: contracts + prices) ───
-    def _sync_get_option_contracts(self, symbol: str, sec_type: str, exchange: str, currency: str,
-                                    ma_price: float, right: str, num_strikes: int,
-                                    contract_month: str = "", num_expirations: int = 5) -> List[Dict[str, Any]]:
-        """Step 1: Get option contract info (strikes, expiries) — NO market data request. Fast.
-
-        For futures: merges ALL chains (daily/weekly/monthly) and picks the nearest
-        num_expirations dates across all trading classes.
-        """
-        ib = self._get_ib()
-        contract = self._make_contract(symbol, sec_type, exchange, currency, contract_month)
-        qualified = ib.qualifyContracts(contract)
-        if not qualified:
-            return []
-        contract = qualified[0]
+    async def _get_option_chains(self, contract: Contract, symbol: str, sec_type: str, exchange: str) -> list:
+        """Option chain definitions for a qualified underlying, cached for OPTION_CHAIN_TTL."""
+        key = (contract.symbol, exchange, contract.conId)
+        hit = self._chain_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < OPTION_CHAIN_TTL:
+            return hit[1]
+        ib = self.ib
 
         # For futures, use the exchange; for stocks, use ""
         # Special handling for COMEX metals (GC, MGC, SI, HG) - try NYMEX first
         fut_fop_exchange = exchange if sec_type == "FUT" else ""
-        chains = ib.reqSecDefOptParams(contract.symbol, fut_fop_exchange, contract.secType, contract.conId)
+        chains = await ib.reqSecDefOptParamsAsync(contract.symbol, fut_fop_exchange, contract.secType, contract.conId)
         
         # If no chains found for COMEX, try NYMEX (metals options are often listed there)
         if not chains and exchange == "COMEX":
             logger.info("No chains at COMEX for %s, trying NYMEX...", symbol)
-            chains = ib.reqSecDefOptParams(contract.symbol, "NYMEX", contract.secType, contract.conId)
+            chains = await ib.reqSecDefOptParamsAsync(contract.symbol, "NYMEX", contract.secType, contract.conId)
         
         # Last resort: try empty exchange (let IB find it)
         if not chains:
             logger.info("Trying empty exchange for %s options...", symbol)
-            chains = ib.reqSecDefOptParams(contract.symbol, "", contract.secType, contract.conId)
+            chains = await ib.reqSecDefOptParamsAsync(contract.symbol, "", contract.secType, contract.conId)
         
         if not chains:
             logger.warning("No option chains found for %s (exchange=%s)", symbol, fut_fop_exchange)
             return []
+        self._chain_cache[key] = (time.monotonic(), chains)
+        return chains
+
+    async def _get_option_contracts(self, symbol: str, sec_type: str, exchange: str, currency: str,
+                                    ma_price: float, right: str, num_strikes: int,
+                                    contract_month: str = "", num_expirations: int = 5) -> List[Dict[str, Any]]:
+        """Step 1: Get option contract info (strikes, expiries) — NO market data request. Fast.
+
+        For futures: merges ALL chains (daily/weekly/monthly) and picks the nearest
+        num_expirations dates across all trading classes. Every expiration's
+        strikes are qualified concurrently.
+        """
+        ib = self.ib
+        contract = await self._qualify(symbol, sec_type, exchange, currency, contract_month)
+        if not contract:
+            return []
+
+        chains = await self._get_option_chains(contract, symbol, sec_type, exchange)
+        if not chains:
+            return []
 
         is_fut = sec_type == "FUT"
         today = datetime.now()
@@ -351,7 +351,7 @@ class IBManager:
             if not otm:
                 return []
 
-            result = []
+            batches = []  # (expiry, unqualified contracts)
             for exp in sorted_exps:
                 chain = exp_chain_map[exp]
                 opt_exchange = chain.exchange
@@ -371,8 +371,11 @@ class IBManager:
                                  strike=strike, right=right, multiplier=chain.multiplier,
                                  tradingClass=chain.tradingClass)
                     opts.append(c)
+                batches.append((exp, opts))
 
-                qualified_opts = ib.qualifyContracts(*opts)
+            qualified_batches = await asyncio.gather(*(ib.qualifyContractsAsync(*opts) for _, opts in batches))
+            result = []
+            for (exp, _), qualified_opts in zip(batches, qualified_batches):
                 for opt in qualified_opts:
                     if opt.conId == 0:
                         continue
@@ -388,8 +391,8 @@ class IBManager:
                         "multiplier": float(opt.multiplier) if opt.multiplier else 100,
                         "name": f"{opt.symbol} {exp_label} {opt.strike}{opt.right}",
                         "bid": None, "ask": None, "last": None, "volume": 0,
-                        "_contract": opt,
                     })
+                    self._option_contracts[opt.conId] = opt
 
             logger.info("Got %d %s option contracts for %s across %d expirations (ma=%.2f)",
                          len(result), right, symbol, len(sorted_exps), ma_price)
@@ -415,9 +418,12 @@ class IBManager:
             opt_exchange = chain.exchange
             logger.info("Using option exchange=%s for %s (STK, %d exps, %d strikes)",
                          opt_exchange, symbol, len(expirations), len(otm))
-            for exp in expirations:
-                opts = [Option(symbol, exp, strike, right, opt_exchange, currency=currency) for strike in otm]
-                qualified_opts = ib.qualifyContracts(*opts)
+            qualified_batches = await asyncio.gather(*(
+                ib.qualifyContractsAsync(*(Option(symbol, exp, strike, right, opt_exchange, currency=currency)
+                                           for strike in otm))
+                for exp in expirations
+            ))
+            for exp, qualified_opts in zip(expirations, qualified_batches):
                 for opt in qualified_opts:
                     if opt.conId == 0:
                         continue
@@ -432,35 +438,45 @@ class IBManager:
                         "multiplier": float(opt.multiplier) if opt.multiplier else 100,
                         "name": f"{opt.symbol} {exp_label} {opt.strike}{opt.right}",
                         "bid": None, "ask": None, "last": None, "volume": 0,
-                        "_contract": opt,
                     })
+                    self._option_contracts[opt.conId] = opt
             logger.info("Got %d %s option contracts for %s (ma=%.2f)", len(result), right, symbol, ma_price)
             return result
 
-    def _sync_refresh_option_prices(self, options: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def _refresh_option_prices(self, options: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Step 2: Batch-fetch prices for cached option contracts using snapshots."""
-        ib = self._get_ib()
-        if not options:
-            return options
+        ib = self.ib
+
+        # Reconstruct (and qualify, concurrently) any contracts not cached yet
+        contracts = [self._option_contracts.get(o.get("conId")) for o in options]
+        missing = [i for i, c in enumerate(contracts) if c is None]
+        if missing:
+            rebuilt = await asyncio.gather(*(
+                ib.qualifyContractsAsync(Option(options[i]["symbol"], options[i]["expiry"],
+                                                options[i]["strike"], options[i]["right"], "SMART"))
+                for i in missing
+            ))
+            for i, qualified in zip(missing, rebuilt):
+                if qualified:
+                    contracts[i] = qualified[0]
+                    self._option_contracts[contracts[i].conId] = contracts[i]
 
         # Request all snapshots at once
         tickers = []
-        for o in options:
-            contract = o.get("_contract")
-            if not contract:
-                # Reconstruct contract from data
-                contract = Option(o["symbol"], o["expiry"], o["strike"], o["right"], "SMART")
-                qualified = ib.qualifyContracts(contract)
-                if qualified:
-                    contract = qualified[0]
-                else:
-                    tickers.append(None)
-                    continue
+        for contract in contracts:
+            if contract is None:
+                tickers.append(None)
+                continue
             ticker = ib.reqMktData(contract, "", True, False)  # snapshot=True
             tickers.append((contract, ticker))
 
-        # Wait once for all snapshots
-        ib.sleep(2)
+        # Wait once for all snapshots — until every ticker has a quote, at most 2s
+        pending = [t for _, t in filter(None, tickers)]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 2
+        while pending and loop.time() < deadline:
+            await asyncio.sleep(0.1)
+            pending = [t for t in pending if not _has_quote(t)]
 
         # Collect results and cancel
         for i, item in enumerate(tickers):
@@ -487,11 +503,8 @@ class IBManager:
         try:
             if not self.connected:
                 return []
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                _ib_executor,
-                lambda: self._sync_get_option_contracts(symbol, sec_type, exchange, currency, ma_price, right, num_strikes, contract_month, num_expirations)
-            )
+            return await self._get_option_contracts(symbol, sec_type, exchange, currency, ma_price,
+                                                    right, num_strikes, contract_month, num_expirations)
         except Exception as e:
             logger.error("Failed to get option chain for %s: %s", symbol, e)
             return []
@@ -501,66 +514,114 @@ class IBManager:
         try:
             if not self.connected or not options:
                 return options
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                _ib_executor,
-                lambda: self._sync_refresh_option_prices(options)
-            )
+            return await self._refresh_option_prices(options)
         except Exception as e:
             logger.error("Failed to refresh option prices: %s", e)
             return options
 
     # ─── Order Management ───
 
-    def _sync_get_contract_by_conid(self, con_id: int) -> Optional[Contract]:
+    async def _get_contract_by_conid(self, con_id: int) -> Optional[Contract]:
         """Look up a contract by conId from options cache or reconstruct."""
-        ib = self._get_ib()
-        contract = Contract(conId=con_id)
-        qualified = ib.qualifyContracts(contract)
-        return qualified[0] if qualified else None
-
-    def _sync_place_market_order(self, contract, action: str, quantity: int) -> Dict[str, Any]:
-        """Place a market order. action = 'BUY' or 'SELL'."""
-        ib = self._get_ib()
-        order = MarketOrder(action, quantity)
-        trade = ib.placeOrder(contract, order)
-        ib.sleep(2)  # Wait for initial fill
-        return {
-            "orderId": trade.order.orderId,
-            "status": trade.orderStatus.status,
-            "filled": float(trade.orderStatus.filled),
-            "avgFillPrice": float(trade.orderStatus.avgFillPrice),
-            "remaining": float(trade.orderStatus.remaining),
-        }
+        cached = self._option_contracts.get(con_id) or self._contracts_by_conid.get(con_id)
+        if cached is not None:
+            return cached
+        qualified = await self.ib.qualifyContractsAsync(Contract(conId=con_id))
+        if not qualified:
+            return None
+        self._contracts_by_conid[con_id] = qualified[0]
+        return qualified[0]
 
-    def _sync_place_limit_order(self, contract, action: str, quantity: int, limit_price: float) -> Dict[str, Any]:
-        """Place a limit order for exit strategy."""
-        ib = self._get_ib()
-        order = LimitOrder(action, quantity, limit_price)
-        trade = ib.placeOrder(contract, order)
-        ib.sleep(1)
-        return {
-            "orderId": trade.order.orderId,
-            "status": trade.orderStatus.status,
-            "filled": float(trade.orderStatus.filled),
-            "avgFillPrice": float(trade.orderStatus.avgFillPrice),
-        }
+    async def _place_orders(self, legs: List[Tuple[int, Any]], wait: float,
+                            until_done: bool) -> List[Dict[str, Any]]:
+        """Place several (conId, order) legs, then wait once for their initial status.
 
-    def _sync_cancel_order(self, order_id: int):
-        """Cancel an order by orderId."""
-        ib = self._get_ib()
-        for trade in ib.openTrades():
-            if trade.order.orderId == order_id:
+        Contracts are resolved concurrently and every leg is submitted before
+        the wait, which ends as soon as every order is done (until_done) or
+        acknowledged, or after wait seconds. A leg that fails comes back as
+        {"error": ...}.
+        """
+        ib = self.ib
+        contracts = await asyncio.gather(*(self._get_contract_by_conid(con_id) for con_id, _ in legs),
+                                         return_exceptions=True)
+        placed = []
+        for (con_id, order), contract in zip(legs, contracts):
+            try:
+                if isinstance(contract, Exception):
+                    raise contract
+                if not contract:
+                    placed.append({"error": f"Could not qualify contract conId={con_id}"})
+                    continue
+                placed.append(ib.placeOrder(contract, order))
+            except Exception as e:
+                logger.error("Order failed for conId=%s: %s", con_id, e)
+                placed.append({"error": str(e)})
+
+        trades = [t for t in placed if not isinstance(t, dict)]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while trades and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+            trades = [t for t in trades
+                      if not (t.isDone() if until_done else t.orderStatus.status in _ACKED_STATUSES)]
+
+        results = []
+        for trade in placed:
+            if isinstance(trade, dict):
+                results.append(trade)
+                continue
+            result = {
+                "orderId": trade.order.orderId,
+                "status": trade.orderStatus.status,
+                "filled": float(trade.orderStatus.filled),
+                "avgFillPrice": float(trade.orderStatus.avgFillPrice),
+            }
+            if until_done:
+                result["remaining"] = float(trade.orderStatus.remaining)
+            results.append(result)
+        return results
+
+    async def place_market_orders(self, orders: List[Tuple[int, str, int]]) -> List[Dict[str, Any]]:
+        """Place market orders for (conId, action, quantity) legs in one batch."""
+        legs = [(con_id, MarketOrder(action, quantity)) for con_id, action, quantity in orders]
+        return await self._place_orders(legs, 2, True)  # wait (up to 2s) for the fills
+
+    async def place_limit_orders(self, orders: List[Tuple[int, str, int, float]]) -> List[Dict[str, Any]]:
+        """Place limit orders for (conId, action, quantity, limit_price) legs in one batch."""
+        legs = [(con_id, LimitOrder(action, quantity, limit_price))
+                for con_id, action, quantity, limit_price in orders]
+        return await self._place_orders(legs, 1, False)
+
+    async def place_market_order(self, con_id: int, action: str, quantity: int) -> Dict[str, Any]:
+        """Place a market order by conId (async wrapper)."""
+        return (await self.place_market_orders([(con_id, action, quantity)]))[0]
+
+    async def place_limit_order(self, con_id: int, action: str, quantity: int, limit_price: float) -> Dict[str, Any]:
+        """Place a limit order by conId (async wrapper)."""
+        return (await self.place_limit_orders([(con_id, action, quantity, limit_price)]))[0]
+
+    async def cancel_orders(self, order_ids: List[int]) -> List[bool]:
+        """Cancel orders by orderId in one batch; True for each one that was found open."""
+        ib = self.ib
+        open_trades = {t.order.orderId: t for t in ib.openTrades()}
+        found = []
+        for order_id in order_ids:
+            trade = open_trades.get(order_id)
+            if trade:
                 ib.cancelOrder(trade.order)
-                ib.sleep(0.5)
-                return True
-        return False
+            found.append(trade is not None)
+        if any(found):
+            await asyncio.sleep(0.5)
+        return found
 
-    def _sync_get_open_orders(self) -> List[Dict]:
+    async def cancel_order(self, order_id: int) -> bool:
+        """Cancel an order by orderId (async wrapper)."""
+        return (await self.cancel_orders([order_id]))[0]
+
+    async def get_open_orders(self) -> List[Dict]:
         """Get all open orders."""
-        ib = self._get_ib()
         result = []
-        for trade in ib.openTrades():
+        for trade in self.ib.openTrades():
             c = trade.contract
             result.append({
                 "orderId": trade.order.orderId,
@@ -576,153 +637,116 @@ class IBManager:
             })
         return result
 
-    async def place_market_order(self, con_id: int, action: str, quantity: int) -> Dict[str, Any]:
-        """Place a market order by conId (async wrapper)."""
-        def _do():
-            contract = self._sync_get_contract_by_conid(con_id)
-            if not contract:
-                return {"error": f"Could not qualify contract conId={con_id}"}
-            return self._sync_place_market_order(contract, action, quantity)
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_ib_executor, _do)
-
-    async def place_limit_order(self, con_id: int, action: str, quantity: int, limit_price: float) -> Dict[str, Any]:
-        """Place a limit order by conId (async wrapper)."""
-        def _do():
-            contract = self._sync_get_contract_by_conid(con_id)
-            if not contract:
-                return {"error": f"Could not qualify contract conId={con_id}"}
-            return self._sync_place_limit_order(contract, action, quantity, limit_price)
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_ib_executor, _do)
-
-    async def cancel_order(self, order_id: int) -> bool:
-        """Cancel an order by orderId (async wrapper)."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_ib_executor, lambda: self._sync_cancel_order(order_id))
-
-    async def get_open_orders(self) -> List[Dict]:
-        """Get all open orders (async wrapper)."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(_ib_executor, self._sync_get_open_orders)
+    async def get_account_snapshot(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict]]:
+        """(account summary, positions, open orders), fetched concurrently."""
+        return tuple(await asyncio.gather(self.get_account_summary(), self.get_positions(), self.get_open_orders()))
 
     # ─── Streaming Price Subscriptions ───
 
-    def _sync_subscribe_price(self, watch_id: str, symbol: str, sec_type: str,
+    async def subscribe_price(self, watch_id: str, symbol: str, sec_type: str,
                                exchange: str, currency: str, contract_month: str = "") -> bool:
-        """Subscribe to streaming market data for a watch item. Runs in executor thread."""
-        ib = self._get_ib()
-        contract = self._make_contract(symbol, sec_type, exchange, currency, contract_month)
-        qualified = ib.qualifyContracts(contract)
-        if not qualified:
-            logger.error("Cannot qualify contract for subscription: %s", symbol)
+        """Subscribe to streaming market data for a watch item."""
+        try:
+            if not self.connected:
+                return False
+            contract = await self._qualify(symbol, sec_type, exchange, currency, contract_month)
+            if not contract:
+                logger.error("Cannot qualify contract for subscription: %s", symbol)
+                return False
+            ticker = self.ib.reqMktData(contract, "", False, False)  # snapshot=False → streaming
+            _subscriptions[watch_id] = (contract, ticker)
+            _rebuild_sub_tickers()
+            logger.info("📡 Subscribed to price stream: %s (conId=%d)", symbol, contract.conId)
+            return True
+        except Exception as e:
+            logger.error("Failed to subscribe %s: %s", symbol, e)
             return False
-        contract = qualified[0]
-        ticker = ib.reqMktData(contract, "", False, False)  # snapshot=False → streaming
-        _subscriptions[watch_id] = (contract, ticker)
-        logger.info("📡 Subscribed to price stream: %s (conId=%d)", symbol, contract.conId)
-        return True
 
-    def _sync_unsubscribe_price(self, watch_id: str):
+    async def unsubscribe_price(self, watch_id: str):
         """Unsubscribe from market data for a watch item."""
         if watch_id in _subscriptions:
-            ib = self._get_ib()
             contract, ticker = _subscriptions.pop(watch_id)
+            _rebuild_sub_tickers()
             try:
-                ib.cancelMktData(contract)
+                self.ib.cancelMktData(contract)
                 logger.info("Unsubscribed: %s", contract.symbol)
             except Exception as e:
                 logger.error("Error unsubscribing %s: %s", contract.symbol, e)
 
-    def _sync_unsubscribe_all(self):
+    async def unsubscribe_all(self):
         """Unsubscribe all active price streams."""
-        ib = self._get_ib()
         for watch_id in list(_subscriptions.keys()):
             contract, ticker = _subscriptions.pop(watch_id)
             try:
-                ib.cancelMktData(contract)
+                self.ib.cancelMktData(contract)
             except Exception:
                 pass
+        _rebuild_sub_tickers()
         logger.info("Unsubscribed all price streams")
 
-    def _sync_read_prices(self) -> Dict[str, Dict]:
+    async def read_prices(self) -> Dict[str, Dict]:
         """Read current prices and OHLC from all active subscriptions.
 
-        Processes pending IB events, then reads cached ticker values.
-        Very fast — no new API requests.
-        
-        Returns: {watch_id: {price, open, high, low, close}}
-        """
-        ib = self._get_ib()
-        ib.sleep(0.1)  # Process pending messages from IB
-
-        prices = {}
-        for watch_id, (contract, ticker) in _subscriptions.items():
-            price = ticker.marketPrice()
-            if math.isnan(price):
-                # Fallback: try close price
-                price = ticker.close
-                if math.isnan(price):
-                    continue
-            if price > 0:
-                # Get OHLC data (day's open, high, low)
-                day_open = ticker.open if not math.isnan(ticker.open) else price
-                day_high = ticker.high if not math.isnan(ticker.high) else price
-                day_low = ticker.low if not math.isnan(ticker.low) else price
-                prices[watch_id] = {
-                    "price": float(price),
-                    "open": float(day_open),
-                    "high": float(day_high),
-                    "low": float(day_low),
-                }
-        return prices
+        ib_insync updates the tickers as messages arrive on the event loop, so
+        this only reads cached values. Very fast — no API requests.
 
-    async def subscribe_price(self, watch_id: str, symbol: str, sec_type: str,
-                               exchange: str, currency: str, contract_month: str = "") -> bool:
-        """Subscribe to streaming price data (async wrapper)."""
+        Returns: {watch_id: {price, open, high, low}}
+        """
         try:
             if not self.connected:
-                return False
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                _ib_executor,
-                lambda: self._sync_subscribe_price(watch_id, symbol, sec_type, exchange, currency, contract_month)
-            )
-        except Exception as e:
-            logger.error("Failed to subscribe %s: %s", symbol, e)
-            return False
-
-    async def unsubscribe_price(self, watch_id: str):
-        """Unsubscribe from streaming price data (async wrapper)."""
-        try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(_ib_executor, lambda: self._sync_unsubscribe_price(watch_id))
+                return {}
+            prices = {}
+            # x != x is the NaN test (a single compare, no call)
+            for watch_id, ticker in _sub_tickers:
+                price = ticker.marketPrice()
+                if price != price:
+                    # Fallback: try close price
+                    price = ticker.close
+                    if price != price:
+                        continue
+                if price > 0:
+                    # Get OHLC data (day's open, high, low)
+                    day_open = ticker.open
+                    day_high = ticker.high
+                    day_low = ticker.low
+                    if day_open != day_open:
+                        day_open = price
+                    if day_high != day_high:
+                        day_high = price
+                    if day_low != day_low:
+                        day_low = price
+                    prices[watch_id] = {
+                        "price": float(price),
+                        "open": float(day_open),
+                        "high": float(day_high),
+                        "low": float(day_low),
+                    }
+            return prices
         except Exception as e:
-            logger.error("Failed to unsubscribe %s: %s", watch_id, e)
+            logger.error("Failed to read prices: %s", e)
+            return {}
 
-    async def unsubscribe_all(self):
-        """Unsubscribe all price streams (async wrapper)."""
-        try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(_ib_executor, self._sync_unsubscribe_all)
-        except Exception as e:
-            logger.error("Failed to unsubscribe all: %s", e)
+    async def wait_for_prices(self, timeout: float = 1.0) -> bool:
+        """Wait until streaming prices change, or timeout seconds pass.
 
-    async def read_prices(self) -> Dict[str, float]:
-        """Read all streaming prices (async wrapper). Fast — no API calls."""
+        Returns True if tickers were updated. Does not (re)connect — the
+        monitor loop handles that.
+        """
+        if not self.connected:
+            await asyncio.sleep(timeout)
+            return False
         try:
-            if not self.connected:
-                return {}
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(_ib_executor, self._sync_read_prices)
+            await asyncio.wait_for(_next_emit(self.ib.pendingTickersEvent), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
         except Exception as e:
-            logger.error("Failed to read prices: %s", e)
-            return {}
+            logger.error("Failed to wait for prices: %s", e)
+            return False
 
     async def sleep(self, seconds: float = 0):
-        """Keep IB event loop alive."""
-        if self.connected:
-            util.sleep(seconds)
+        """Yield to the event loop (ib_insync processes IB messages there)."""
+        await asyncio.sleep(seconds)
 
     def get_underlying_info(self, watch_id: str) -> Optional[Dict[str, Any]]:
         """Get underlying contract info (conId, multiplier) for a watch item."""
@@ -741,3 +765,12 @@ class IBManager:
             "symbol": contract.symbol,
             "secType": contract.secType,
         }
+
+    def has_option_contract(self, con_id: Optional[int]) -> bool:
+        """Whether a qualified Contract is cached for this option conId."""
+        return con_id in self._option_contracts
+
+    def retain_option_contracts(self, con_ids) -> None:
+        """Drop cached option Contracts whose conId is not in con_ids (still referenced)."""
+        for con_id in self._option_contracts.keys() - con_ids:
+            del self._option_contracts[con_id]
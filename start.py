@@ -3,4 +3,8 @@ import os
 import uvicorn
 
 port = int(os.environ.get("PORT", "10000"))
-uvicorn.run("app:app", host="0.0.0.0", port=port, log_level="info")
+demo_mode = os.environ.get("DEMO_MODE", "false").lower() in ("true", "1", "yes")
+# uvloop (picked by "auto" when installed) can't be patched by nest_asyncio,
+# which ib_insync needs — only use it in demo mode
+uvicorn.run("app:app", host="0.0.0.0", port=port, log_level="info",
+            loop="auto" if demo_mode else "asyncio")
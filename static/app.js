@@ -647,10 +647,13 @@ async function logout() {
 
 // ─── WebSocket ───
 let wsPingInterval = null;
+const wsTextDecoder = new TextDecoder();
 
 function connectWS() {
     const proto = location.protocol === 'https:' ? 'wss' : 'ws';
     ws = new WebSocket(`${proto}://${location.host}/ws`);
+    // Broadcasts arrive as binary (UTF-8 JSON) frames; decode synchronously
+    ws.binaryType = 'arraybuffer';
 
     ws.onopen = () => {
         log('WebSocket 已連線', 'success');
@@ -665,7 +668,8 @@ function connectWS() {
     };
 
     ws.onmessage = (e) => {
-        const msg = JSON.parse(e.data);
+        const text = typeof e.data === 'string' ? e.data : wsTextDecoder.decode(e.data);
+        const msg = JSON.parse(text);
         handleMessage(msg);
     };
 
@@ -708,30 +712,15 @@ function handleMessage(msg) {
             renderOrders();
             updateStatusUI();
             break;
-        case 'data_update': {
-            // Merge incoming data, preserve client-side state (selected_expiry, etc.)
-            const prev = state.latestData[msg.watch_id] || {};
-            state.latestData[msg.watch_id] = { ...prev, ...msg.data };
-            if (prev.selected_expiry && !msg.data.selected_expiry) {
-                state.latestData[msg.watch_id].selected_expiry = prev.selected_expiry;
-            }
-            // Always update live candle if chart exists (even if not currently shown)
-            if (chartSeries[msg.watch_id]?.candle && msg.data.current_price) {
-                updateLiveCandle(msg.watch_id, msg.data.current_price);
-            }
-            
-            // If chart is expanded, update price displays
-            if (state.expandedChart && chartSeries[state.expandedChart]) {
-                updatePriceDisplays(msg.watch_id, msg.data);
-            } else {
-                renderWatchList();
-                // Render chart if just expanded
-                if (state.expandedChart && !chartSeries[state.expandedChart]) {
-                    setTimeout(() => renderChart(state.expandedChart), 100);
-                }
-            }
+        case 'data_update':
+            applyDataUpdate(msg.watch_id, msg.data);
+            renderDataUpdate();
+            break;
+        case 'batch_update':
+            // One frame per monitor tick: [{watch_id, data}, ...]
+            (msg.updates || []).forEach(u => applyDataUpdate(u.watch_id, u.data));
+            renderDataUpdate();
             break;
-        }
         case 'watch_update':
             state.watchList = msg.watch_list || [];
             renderWatchList();
@@ -769,6 +758,33 @@ function handleMessage(msg) {
     }
 }
 
+function applyDataUpdate(watchId, data) {
+    // Merge incoming data, preserve client-side state (selected_expiry, etc.)
+    const prev = state.latestData[watchId] || {};
+    state.latestData[watchId] = { ...prev, ...data };
+    if (prev.selected_expiry && !data.selected_expiry) {
+        state.latestData[watchId].selected_expiry = prev.selected_expiry;
+    }
+    // Always update live candle if chart exists (even if not currently shown)
+    if (chartSeries[watchId]?.candle && data.current_price) {
+        updateLiveCandle(watchId, data.current_price);
+    }
+    // If chart is expanded, update price displays in place
+    if (state.expandedChart && chartSeries[state.expandedChart]) {
+        updatePriceDisplays(watchId, data);
+    }
+}
+
+function renderDataUpdate() {
+    // Chart expanded → displays were already patched in applyDataUpdate
+    if (state.expandedChart && chartSeries[state.expandedChart]) return;
+    renderWatchList();
+    // Render chart if just expanded
+    if (state.expandedChart && !chartSeries[state.expandedChart]) {
+        setTimeout(() => renderChart(state.expandedChart), 100);
+    }
+}
+
 // ─── API calls ───
 async function _realApi(path, method = 'GET', body = null) {
     const opts = { method, headers: { 'Content-Type': 'application/json' } };
@@ -12,18 +12,39 @@ import time
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
 
 try:
     import pandas as pd
-    import numpy as np
     HAS_PANDAS = True
 except ImportError:
     HAS_PANDAS = False
 
+from strategy_kernels import ma_bb_last
+
 logger = logging.getLogger(__name__)
 
 
+def _tail(arr, n: int):
+    """Last n items of an array (empty for n <= 0, unlike arr[-0:])."""
+    return arr[len(arr) - n:] if n > 0 else arr[:0]
+
+
+def _ma_bb(closes, period: int, bb_std: float = 0.0):
+    """(ma, prev_ma, std) from the trailing windows of a float close array.
+
+    Returns None if either MA point is undefined (NaN in the window).
+    """
+    if period < 1 or len(closes) < period + 1:
+        return None
+    ma, prev_ma, std, _, _ = ma_bb_last(closes, int(period), float(bb_std), 1)
+    if math.isnan(ma) or math.isnan(prev_ma):
+        return None
+    return ma, prev_ma, std
+
+
 class SignalType(str, Enum):
     BUY = "BUY"
     SELL = "SELL"
@@ -50,7 +71,9 @@ class WatchItem:
     trading_config: Optional[Dict[str, Any]] = None  # Auto-trading config: {auto_trade, targets, exit}
 
     def to_dict(self):
-        return asdict(self)
+        # Shallow copy of the fields (same keys/order as asdict) — asdict deep-copies
+        # trading_config on every watch_update broadcast and config save
+        return dict(self.__dict__)
 
 
 @dataclass
@@ -68,7 +91,7 @@ class Signal:
     acknowledged: bool = False
 
     def to_dict(self):
-        return asdict(self)
+        return dict(self.__dict__)  # flat scalar fields — no need for asdict's recursion
 
 
 @dataclass
@@ -113,6 +136,69 @@ class ThresholdCache:
     bb_middle: Optional[float] = None  # Same as MA
 
 
+CHART_BARS = 120  # candles kept for the chart (about 6 months of daily data)
+
+
+@dataclass
+class CandleSeries:
+    """Chart candles as parallel column arrays (struct-of-arrays).
+
+    Indicator kernels read the columns directly; the list-of-dicts shape the
+    frontend expects is only built at the response boundary (to_list).
+    """
+    time: np.ndarray   # int64 unix seconds
+    open: np.ndarray   # float64
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @classmethod
+    def from_df(cls, df, limit: int = CHART_BARS) -> "CandleSeries":
+        """Last `limit` bars of an OHLC DataFrame indexed by timestamp."""
+        tail = df.tail(limit)
+        if isinstance(tail.index, pd.DatetimeIndex):
+            # .values is UTC datetime64 for tz-aware and naive alike (any resolution) → epoch seconds
+            times = tail.index.values.astype("datetime64[s]").astype(np.int64)
+        else:
+            now = int(time.time())
+            times = np.fromiter(
+                (int(idx.timestamp()) if hasattr(idx, 'timestamp') else now for idx in tail.index),
+                dtype=np.int64, count=len(tail),
+            )
+        return cls(
+            time=times,
+            open=tail["open"].to_numpy(dtype=np.float64),
+            high=tail["high"].to_numpy(dtype=np.float64),
+            low=tail["low"].to_numpy(dtype=np.float64),
+            close=tail["close"].to_numpy(dtype=np.float64),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict], limit: int = CHART_BARS) -> "CandleSeries":
+        """Last `limit` bars of a list of {time, open, high, low, close} dicts."""
+        rows = rows[-limit:]
+        now = int(time.time())
+        n = len(rows)
+        return cls(
+            time=np.fromiter((int(r.get("time", now)) for r in rows), dtype=np.int64, count=n),
+            open=np.fromiter((r["open"] for r in rows), dtype=np.float64, count=n),
+            high=np.fromiter((r["high"] for r in rows), dtype=np.float64, count=n),
+            low=np.fromiter((r["low"] for r in rows), dtype=np.float64, count=n),
+            close=np.fromiter((r["close"] for r in rows), dtype=np.float64, count=n),
+        )
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """[{time, open, high, low, close}, ...] for JSON responses."""
+        return [
+            {"time": t, "open": o, "high": h, "low": lo, "close": c}
+            for t, o, h, lo, c in zip(self.time.tolist(), self.open.tolist(), self.high.tolist(),
+                                      self.low.tolist(), self.close.tolist())
+        ]
+
+
 @dataclass
 class ActiveTrade:
     """An active trade with entry and exit conditions."""
@@ -132,10 +218,12 @@ class ActiveTrade:
 class StrategyEngine:
     def __init__(self):
         self.watch_list: Dict[str, WatchItem] = {}
+        self._enabled_watches: Dict[str, WatchItem] = {}  # enabled subset of watch_list (same order); rebound, never mutated
+        self._watch_list_snapshot: Optional[List[Dict[str, Any]]] = None  # get_watch_list() cache
         self.signals: List[Signal] = []
         self.latest_data: Dict[str, Dict[str, Any]] = {}  # watch_id -> frontend data
         self._thresholds: Dict[str, ThresholdCache] = {}   # watch_id -> cached thresholds
-        self._candles: Dict[str, List[Dict]] = {}  # watch_id -> [{time, open, high, low, close}]
+        self._candles: Dict[str, CandleSeries] = {}  # watch_id -> chart candles
         self.active_trades: Dict[str, ActiveTrade] = {}
         self._running = False
 
@@ -151,21 +239,29 @@ class StrategyEngine:
         self._running = False
         logger.info("Strategy engine stopped")
 
+    def _sync_enabled(self):
+        """Rebuild the enabled view after add/remove/enable toggles (rare vs. ticks)."""
+        self._enabled_watches = {wid: w for wid, w in self.watch_list.items() if w.enabled}
+
     def add_watch(self, item: WatchItem):
         self.watch_list[item.id] = item
+        self._sync_enabled()
+        self._watch_list_snapshot = None
         logger.info("Added watch: %s (%s)", item.symbol, item.id)
 
     def remove_watch(self, watch_id: str):
         if watch_id in self.watch_list:
             del self.watch_list[watch_id]
+            self._sync_enabled()
+            self._watch_list_snapshot = None
         self._thresholds.pop(watch_id, None)
         self.latest_data.pop(watch_id, None)
         self._candles.pop(watch_id, None)
         logger.info("Removed watch: %s", watch_id)
 
-    def get_candles(self, watch_id: str) -> List[Dict]:
+    def get_candles(self, watch_id: str) -> Optional[CandleSeries]:
         """Get stored candles for a watch item."""
-        return self._candles.get(watch_id, [])
+        return self._candles.get(watch_id)
 
     def update_watch(self, watch_id: str, updates: Dict[str, Any]):
         if watch_id in self.watch_list:
@@ -173,6 +269,9 @@ class StrategyEngine:
             for k, v in updates.items():
                 if hasattr(item, k):
                     setattr(item, k, v)
+            self._watch_list_snapshot = None
+            if 'enabled' in updates:
+                self._sync_enabled()
             # Invalidate threshold cache if strategy params changed
             if any(k in updates for k in ('ma_period', 'n_points', 'direction', 'enabled')):
                 self._thresholds.pop(watch_id, None)
@@ -220,16 +319,20 @@ class StrategyEngine:
         if length < watch.ma_period + 1:
             return None
 
-        ma = self.calculate_ma(df, watch.ma_period)
+        # pandas path: pull the close column into one float array and run the
+        # single-pass MA/BB kernel over the trailing windows only, instead of
+        # materialising full rolling series that are thrown away after .iloc[-1]
+        closes_arr = df["close"].to_numpy(dtype=np.float64) if HAS_PANDAS and hasattr(df, 'iloc') else None
 
-        if HAS_PANDAS and hasattr(ma, 'iloc'):
-            if len(ma) < 2 or pd.isna(ma.iloc[-1]) or pd.isna(ma.iloc[-2]):
+        if closes_arr is not None:
+            ma_bb = _ma_bb(closes_arr, watch.ma_period, watch.bb_std_dev)
+            if ma_bb is None:
                 return None
-            current_ma = float(ma.iloc[-1])
-            prev_ma = float(ma.iloc[-2])
+            current_ma, prev_ma, window_std = ma_bb
             # Extract last N-1 closes for real-time MA (excludes today)
-            hist_closes = list(df["close"].tail(watch.ma_period - 1).astype(float))
+            hist_closes = _tail(closes_arr, watch.ma_period - 1).tolist()
         else:
+            ma = self.calculate_ma(df, watch.ma_period)
             if len(ma) < 2 or ma[-1] is None or ma[-2] is None:
                 return None
             current_ma = float(ma[-1])
@@ -248,11 +351,12 @@ class StrategyEngine:
         current_std = 0.0
         
         if watch.strategy_type == "BB":
-            std = self.calculate_std(df, watch.ma_period)
-            if HAS_PANDAS and hasattr(std, 'iloc'):
-                if not pd.isna(std.iloc[-1]):
-                    current_std = float(std.iloc[-1])
+            if closes_arr is not None:
+                # Sample std (ddof=1) of the last window — same as rolling().std()
+                if not math.isnan(window_std):
+                    current_std = window_std
             else:
+                std = self.calculate_std(df, watch.ma_period)
                 if std[-1] is not None:
                     current_std = float(std[-1])
             
@@ -303,13 +407,12 @@ class StrategyEngine:
         
         if watch.confirm_ma_enabled and watch.confirm_ma_period > 0:
             if length >= watch.confirm_ma_period + 1:
-                confirm_ma = self.calculate_ma(df, watch.confirm_ma_period)
-                if HAS_PANDAS and hasattr(confirm_ma, 'iloc'):
-                    if len(confirm_ma) >= 2 and not pd.isna(confirm_ma.iloc[-1]) and not pd.isna(confirm_ma.iloc[-2]):
-                        confirm_current = float(confirm_ma.iloc[-1])
-                        confirm_prev = float(confirm_ma.iloc[-2])
+                if closes_arr is not None:
+                    confirm_ma_bb = _ma_bb(closes_arr, watch.confirm_ma_period)
+                    if confirm_ma_bb is not None:
+                        confirm_current, confirm_prev, _ = confirm_ma_bb
                         confirm_ma_value = round(confirm_current, 4)
-                        confirm_hist_closes = list(df["close"].tail(watch.confirm_ma_period - 1).astype(float))
+                        confirm_hist_closes = _tail(closes_arr, watch.confirm_ma_period - 1).tolist()
                         if confirm_current > confirm_prev:
                             confirm_ma_direction = "RISING"
                         elif confirm_current < confirm_prev:
@@ -317,6 +420,7 @@ class StrategyEngine:
                         else:
                             confirm_ma_direction = "FLAT"
                 else:
+                    confirm_ma = self.calculate_ma(df, watch.confirm_ma_period)
                     if len(confirm_ma) >= 2 and confirm_ma[-1] is not None and confirm_ma[-2] is not None:
                         confirm_current = float(confirm_ma[-1])
                         confirm_prev = float(confirm_ma[-2])
@@ -365,29 +469,11 @@ class StrategyEngine:
 
         self._thresholds[watch_id] = cache
 
-        # Store candles for chart (last 120 bars — about 6 months of daily data)
-        candles = []
-        if HAS_PANDAS and hasattr(df, 'iterrows'):
-            for idx, row in df.tail(120).iterrows():
-                ts = int(idx.timestamp()) if hasattr(idx, 'timestamp') else int(time.time())
-                candles.append({
-                    "time": ts,
-                    "open": float(row["open"]),
-                    "high": float(row["high"]),
-                    "low": float(row["low"]),
-                    "close": float(row["close"]),
-                })
+        # Store candles for chart (last CHART_BARS bars)
+        if HAS_PANDAS and hasattr(df, 'iloc'):
+            self._candles[watch_id] = CandleSeries.from_df(df)
         else:
-            # Fallback for list of dicts
-            for row in (df[-120:] if len(df) > 120 else df):
-                candles.append({
-                    "time": int(row.get("time", time.time())),
-                    "open": float(row["open"]),
-                    "high": float(row["high"]),
-                    "low": float(row["low"]),
-                    "close": float(row["close"]),
-                })
-        self._candles[watch_id] = candles
+            self._candles[watch_id] = CandleSeries.from_rows(df)
 
         # Populate latest_data for frontend (no price yet — will be updated by check_price)
         self.latest_data[watch_id] = {
@@ -411,20 +497,23 @@ class StrategyEngine:
 
     # ─── Price Check (streaming, every tick) ───
 
-    def check_price(self, watch_id: str, price: float) -> Optional[Signal]:
+    def check_price(self, watch_id: str, price: float,
+                    now_iso: Optional[str] = None) -> Tuple[Optional[Signal], Optional[ThresholdCache]]:
         """Check if streaming price triggers a signal using real-time MA calculation.
 
         Called on every price update from IB streaming.
         Calculates MA using historical closes + current price for accurate trigger.
-        Returns Signal if triggered, None otherwise.
+        Returns (signal, threshold): signal if triggered (else None), plus the
+        watch's ThresholdCache so callers don't look it up again.
+        now_iso lets the caller share one timestamp across all watches in a tick.
         """
         cache = self._thresholds.get(watch_id)
         if not cache or not cache.signal_type:
-            return None
+            return None, cache
 
         watch = self.watch_list.get(watch_id)
         if not watch or not watch.enabled:
-            return None
+            return None, cache
         
         # ─── Initial qualification check (only on first price) ───
         # LONG: price must be ABOVE MA at startup (waiting for pullback)
@@ -455,7 +544,7 @@ class StrategyEngine:
         # If not qualified, skip signal checking
         if not cache.qualified:
             cache.last_price = price
-            return None
+            return None, cache
         
         # Calculate real-time MA using historical closes + current price
         if cache.hist_closes:
@@ -540,6 +629,8 @@ class StrategyEngine:
                 confirm_ma_ok = confirm_ma_direction == "FALLING"
 
         # Update latest_data for frontend display
+        if now_iso is None:
+            now_iso = datetime.now().isoformat()
         distance = round(price - realtime_ma, 4)
         self.latest_data[watch_id] = {
             "symbol": watch.symbol,
@@ -552,7 +643,7 @@ class StrategyEngine:
             "distance_from_ma": distance,
             "buy_zone": buy_zone,
             "sell_zone": sell_zone,
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": now_iso,
             # Confirmation MA info
             "confirm_ma_enabled": watch.confirm_ma_enabled,
             "confirm_ma_period": watch.confirm_ma_period,
@@ -572,9 +663,9 @@ class StrategyEngine:
 
         # Direction filter: LONG only triggers on BUY, SHORT only on SELL
         if watch.direction == "LONG" and signal_type != "BUY":
-            return None
+            return None, cache
         if watch.direction == "SHORT" and signal_type != "SELL":
-            return None
+            return None, cache
 
         # Check if price is in trigger zone
         in_zone = trigger_low <= price <= trigger_high
@@ -582,13 +673,13 @@ class StrategyEngine:
         # Check confirmation MA condition (if enabled, for both MA and BB strategies)
         if not confirm_ma_ok:
             # Confirmation MA direction doesn't match — don't trigger
-            return None
+            return None, cache
 
         if in_zone and not cache.signal_fired:
             # 🔔 Signal fires! (one-shot: won't fire again until manually reset)
             cache.signal_fired = True
             signal = Signal(
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_iso,
                 watch_id=watch_id,
                 symbol=watch.symbol,
                 signal_type=signal_type,
@@ -603,10 +694,10 @@ class StrategyEngine:
                         signal_type, watch.symbol, price,
                         cache.ma_period, realtime_ma,
                         trigger_low, trigger_high)
-            return signal
+            return signal, cache
         # Signal already fired — don't check anymore (one-shot mode)
 
-        return None
+        return None, cache
 
     # ─── Legacy (backward compat) ───
 
@@ -637,6 +728,7 @@ class StrategyEngine:
 
         ma_rising = current_ma > prev_ma
         ma_falling = current_ma < prev_ma
+        now = datetime.now().isoformat()
 
         self.latest_data[watch.id] = {
             "symbol": watch.symbol,
@@ -649,11 +741,9 @@ class StrategyEngine:
             "distance_from_ma": round(current_price - current_ma, 4),
             "buy_zone": f"{round(current_ma, 2)} ~ {round(current_ma + watch.n_points, 2)}" if ma_rising else None,
             "sell_zone": f"{round(current_ma - watch.n_points, 2)} ~ {round(current_ma, 2)}" if ma_falling else None,
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": now,
         }
 
-        now = datetime.now().isoformat()
-
         if ma_rising and current_ma <= current_price <= current_ma + watch.n_points:
             distance = current_price - current_ma
             signal = Signal(
@@ -702,7 +792,13 @@ class StrategyEngine:
         return [s.to_dict() for s in reversed(self.signals[-limit:])]
 
     def get_watch_list(self) -> List[Dict[str, Any]]:
-        return [w.to_dict() for w in self.watch_list.values()]
+        """Watch list as dicts — cached, and the same list object until a watch changes.
+
+        Treat the result as read-only.
+        """
+        if self._watch_list_snapshot is None:
+            self._watch_list_snapshot = [w.to_dict() for w in self.watch_list.values()]
+        return self._watch_list_snapshot
 
     def get_latest_data(self) -> Dict[str, Any]:
         return self.latest_data
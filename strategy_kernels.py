@@ -0,0 +1,122 @@
+"""Numeric kernels for threshold calculation and chart indicators.
+
+JIT-compiled with numba when it is installed (compiled once, cached on disk);
+otherwise the same functions run as plain Python loops. Without numba, the
+chart series use bottleneck's C moving-window functions if that is installed.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit — returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import bottleneck as bn
+    HAS_BOTTLENECK = True
+except ImportError:
+    HAS_BOTTLENECK = False
+
+
+@njit(cache=True)
+def ma_bb_last(close, period, bb_std, ddof):
+    """Last two MA points plus Bollinger Bands of a float64 close array.
+
+    Returns (ma, prev_ma, std, bb_upper, bb_lower). Caller guarantees
+    len(close) >= period + 1. Any NaN in the windows propagates to the result.
+    ddof=1 matches pandas rolling().std().
+    """
+    n = close.shape[0]
+    s = 0.0
+    for i in range(n - period, n):
+        s += close[i]
+    ma = s / period
+
+    s_prev = 0.0
+    for i in range(n - period - 1, n - 1):
+        s_prev += close[i]
+    prev_ma = s_prev / period
+
+    if period - ddof > 0:
+        v = 0.0
+        for i in range(n - period, n):
+            d = close[i] - ma
+            v += d * d
+        std = math.sqrt(v / (period - ddof))
+    else:
+        std = math.nan
+    return ma, prev_ma, std, ma + bb_std * std, ma - bb_std * std
+
+
+@njit(cache=True)
+def chart_indicators(closes, period, bb_std_dev, confirm_period):
+    """MA, Bollinger Bands and confirmation MA series for the chart overlay.
+
+    Returns four float64 arrays the length of closes, NaN until the first
+    full window. All four series come out of one pass with running sums
+    (O(1) per bar); values are shifted by closes[0] so E[x²] − E[x]² doesn't
+    lose precision. BB std is population std (ddof=0).
+    """
+    n = closes.shape[0]
+    ma = np.full(n, np.nan)
+    bb_upper = np.full(n, np.nan)
+    bb_lower = np.full(n, np.nan)
+    confirm_ma = np.full(n, np.nan)
+    if n == 0:
+        return ma, bb_upper, bb_lower, confirm_ma
+    x0 = closes[0]
+
+    s = 0.0
+    s2 = 0.0
+    cs = 0.0
+    for i in range(n):
+        d = closes[i] - x0
+        if period >= 1:
+            s += d
+            s2 += d * d
+            if i >= period:
+                d_out = closes[i - period] - x0
+                s -= d_out
+                s2 -= d_out * d_out
+            if i >= period - 1:
+                mean = s / period
+                var = s2 / period - mean * mean
+                std = math.sqrt(var) if var > 0.0 else 0.0
+                ma[i] = mean + x0
+                bb_upper[i] = ma[i] + bb_std_dev * std
+                bb_lower[i] = ma[i] - bb_std_dev * std
+        if confirm_period >= 1:
+            cs += d
+            if i >= confirm_period:
+                cs -= closes[i - confirm_period] - x0
+            if i >= confirm_period - 1:
+                confirm_ma[i] = cs / confirm_period + x0
+
+    return ma, bb_upper, bb_lower, confirm_ma
+
+
+if HAS_BOTTLENECK and not HAS_NUMBA:
+    def chart_indicators(closes, period, bb_std_dev, confirm_period):
+        """chart_indicators via bottleneck.move_mean / move_std (same output)."""
+        n = closes.shape[0]
+        nan = np.full(n, np.nan)
+        # bottleneck rejects windows longer than the array; those series are all NaN
+        if 1 <= period <= n:
+            ma = bn.move_mean(closes, period)
+            std = bn.move_std(closes, period, ddof=0)
+            bb_upper = ma + bb_std_dev * std
+            bb_lower = ma - bb_std_dev * std
+        else:
+            ma, bb_upper, bb_lower = nan, nan.copy(), nan.copy()
+        confirm_ma = bn.move_mean(closes, confirm_period) if 1 <= confirm_period <= n else nan.copy()
+        return ma, bb_upper, bb_lower, confirm_ma
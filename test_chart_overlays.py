@@ -0,0 +1,127 @@
+"""Chart MA / BB / confirm-MA overlays against pandas rolling windows."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from strategy import CandleSeries, WatchItem
+
+PERIOD = 20
+CONFIRM = 10
+BB_STD = 2.0
+
+
+def random_closes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100.0 + np.cumsum(rng.normal(0.0, 1.5, n))
+
+
+def reference(closes, period=PERIOD, confirm=CONFIRM, bb_std=BB_STD):
+    """(ma, bb_upper, bb_lower, confirm_ma) from pandas; chart bands use population std."""
+    s = pd.Series(closes)
+    ma = s.rolling(period).mean()
+    std = s.rolling(period).std(ddof=0)
+    return (ma.to_numpy(), (ma + bb_std * std).to_numpy(), (ma - bb_std * std).to_numpy(),
+            s.rolling(confirm).mean().to_numpy())
+
+
+def candles_for(closes, start=1_700_000_000):
+    times = start + 86400 * np.arange(len(closes), dtype=np.int64)
+    return CandleSeries(time=times, open=closes, high=closes + 1.0, low=closes - 1.0, close=closes)
+
+
+def as_points(times, values, first):
+    return [{"time": int(t), "value": round(float(v), 4)} for t, v in zip(times[first:], values[first:])]
+
+
+def expected_overlays(candles):
+    """Overlay point lists built straight from the pandas reference."""
+    ma, upper, lower, confirm = reference(candles.close)
+    n = len(candles)
+    t = candles.time
+    return (
+        as_points(t, ma, PERIOD - 1) if n >= PERIOD else [],
+        as_points(t, upper, PERIOD) if n > PERIOD else [],
+        as_points(t, lower, PERIOD) if n > PERIOD else [],
+        as_points(t, confirm, CONFIRM - 1) if n >= CONFIRM else [],
+    )
+
+
+def assert_overlays_equal(actual, expected):
+    for got, want in zip(actual, expected):
+        assert [p["time"] for p in got] == [p["time"] for p in want]
+        np.testing.assert_allclose([p["value"] for p in got], [p["value"] for p in want], atol=1e-4)
+
+
+@pytest.fixture
+def watch():
+    return WatchItem(id="w1", symbol="TEST", ma_period=PERIOD, strategy_type="BB", bb_std_dev=BB_STD,
+                     confirm_ma_enabled=True, confirm_ma_period=CONFIRM)
+
+
+@pytest.fixture(autouse=True)
+def clear_indicator_cache(monkeypatch):
+    monkeypatch.setattr(app, "_indicator_cache", {})
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("n", [1, PERIOD - 1, PERIOD, PERIOD + 1, 250])
+def test_chart_indicators_matches_pandas(kernels, seed, n):
+    closes = random_closes(n, seed)
+    got = kernels.chart_indicators(closes, PERIOD, BB_STD, CONFIRM)
+    for actual, expected in zip(got, reference(closes)):
+        assert actual.shape == (n,)
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)  # NaNs must line up too
+
+
+def test_chart_indicators_fewer_bars_than_period(kernels):
+    closes = random_closes(PERIOD - 1)
+    ma, upper, lower, confirm = kernels.chart_indicators(closes, PERIOD, BB_STD, CONFIRM)
+    assert np.isnan(ma).all() and np.isnan(upper).all() and np.isnan(lower).all()
+    assert not np.isnan(confirm[CONFIRM - 1:]).any()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_full_overlays_match_pandas(watch, seed):
+    candles = candles_for(random_closes(120, seed))
+    assert_overlays_equal(app._chart_overlays("w1", watch, candles), expected_overlays(candles))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("change", ["append", "replace_last", "slide"])
+def test_incremental_overlays_match_full_recompute(watch, seed, change):
+    closes = random_closes(121, seed)
+    old = candles_for(closes[:120])
+    app._chart_overlays("w1", watch, old)
+    prev = app._indicator_cache["w1"]
+
+    if change == "append":
+        new = candles_for(closes)
+    elif change == "replace_last":
+        new = candles_for(np.append(closes[:119], closes[119] + 3.0))
+    else:
+        new = candles_for(closes[1:], start=int(old.time[1]))
+
+    result = app._incremental_overlays(prev, new, watch, PERIOD, CONFIRM)
+    assert result is not None
+    assert_overlays_equal(result, expected_overlays(new))
+    app._indicator_cache.clear()
+    assert_overlays_equal(result, app._chart_overlays("w1", watch, new))
+
+
+@pytest.mark.parametrize("n", [PERIOD - 2, PERIOD - 1, PERIOD])
+def test_incremental_overlays_with_fewer_bars_than_period(watch, n):
+    closes = random_closes(n + 1)
+    app._chart_overlays("w1", watch, candles_for(closes[:n]))
+    new = candles_for(closes)
+    result = app._incremental_overlays(app._indicator_cache["w1"], new, watch, PERIOD, CONFIRM)
+    assert result is not None
+    assert_overlays_equal(result, expected_overlays(new))
+
+
+def test_incremental_overlays_rejects_changed_history(watch):
+    closes = random_closes(121)
+    app._chart_overlays("w1", watch, candles_for(closes[:120]))
+    edited = closes.copy()
+    edited[50] += 1.0
+    assert app._incremental_overlays(app._indicator_cache["w1"], candles_for(edited), watch, PERIOD, CONFIRM) is None
@@ -0,0 +1,80 @@
+"""Debounced config.json writes: edits reach disk, no-op saves are skipped."""
+import asyncio
+
+import orjson
+import pytest
+
+import app
+from strategy import StrategyEngine, WatchItem
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    """Fresh engine with one watch, config.json in tmp_path, and a write counter."""
+    engine = StrategyEngine()
+    engine.add_watch(WatchItem(id="w1", symbol="TEST", n_points=5.0))
+    monkeypatch.setattr(app, "engine", engine)
+    monkeypatch.setattr(app, "CONFIG_FILE", tmp_path / "config.json")
+    monkeypatch.setattr(app, "CONFIG_FLUSH_DELAY", 0.0)
+    monkeypatch.setattr(app, "_config_dirty", None)
+    monkeypatch.setattr(app, "_saved_watch_list", None)
+    writes = []
+    write_config = app._write_config
+    monkeypatch.setattr(app, "_write_config", lambda payload: (writes.append(payload), write_config(payload)))
+    return writes
+
+
+def saved_watch(watch_id="w1"):
+    data = orjson.loads(app.CONFIG_FILE.read_bytes())
+    return next(w for w in data["watch_list"] if w["id"] == watch_id)
+
+
+async def flush():
+    """Let the flusher pick up a pending edit and finish its write."""
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if not app._config_dirty.is_set():
+            break
+    await asyncio.sleep(0.05)
+
+
+def test_update_watch_then_flush_writes_new_value(config):
+    async def scenario():
+        app.save_config()
+        assert saved_watch()["n_points"] == 5.0
+        flusher = asyncio.create_task(app._config_flusher())
+        await asyncio.sleep(0)
+        assert app._config_dirty is not None  # edits now go through the flusher
+        try:
+            await app.update_watch("w1", app.WatchItemUpdate(n_points=7.5))
+            await flush()
+        finally:
+            flusher.cancel()
+
+    asyncio.run(scenario())
+    assert len(config) == 2
+    assert saved_watch()["n_points"] == 7.5
+
+
+def test_unchanged_snapshot_writes_nothing(config):
+    async def scenario():
+        app.save_config()
+        flusher = asyncio.create_task(app._config_flusher())
+        await asyncio.sleep(0)
+        try:
+            app.schedule_save_config()
+            await flush()
+        finally:
+            flusher.cancel()
+
+    asyncio.run(scenario())
+    app.save_config()  # the blocking shutdown path skips too
+    assert len(config) == 1
+
+
+def test_schedule_without_flusher_writes_immediately(config):
+    app.engine.update_watch("w1", {"n_points": 9.0})
+    app.schedule_save_config()
+    assert saved_watch()["n_points"] == 9.0
+    app.schedule_save_config()
+    assert len(config) == 1
@@ -0,0 +1,110 @@
+"""Exit dispatch: the time-exit heap and the per-watch MA/BB exit index."""
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+import app
+from strategy import ThresholdCache
+
+
+class FakeIB:
+    """Records the market orders the exit path places."""
+
+    def __init__(self):
+        self.sells = []
+
+    async def place_market_orders(self, legs):
+        self.sells.extend(legs)
+        return [{"orderId": i, "status": "Filled"} for i, _ in enumerate(legs)]
+
+
+@pytest.fixture
+def fake_ib(monkeypatch, tmp_path):
+    ib = FakeIB()
+    monkeypatch.setattr(app, "ib", ib)
+    monkeypatch.setattr(app, "_active_trades", OrderedDict())
+    monkeypatch.setattr(app, "_time_exit_heap", [])
+    monkeypatch.setattr(app, "_exits_by_watch", {})
+    monkeypatch.setattr(app, "TRADE_LOG_FILE", tmp_path / "trades.jsonl")
+    return ib
+
+
+def make_trade(trade_id, watch_id="w1", exit_cfg=None, status="filled", con_id=101):
+    return {
+        "id": trade_id,
+        "watch_id": watch_id,
+        "status": status,
+        "direction": "BUY",
+        "orders": [{"conId": con_id, "qty_requested": 2}],
+        "exit": {"loop": False, **(exit_cfg or {})},
+    }
+
+
+def make_threshold(ma_value, last_price):
+    return ThresholdCache(ma_value=ma_value, prev_ma=ma_value, ma_rising=True, trigger_low=0.0,
+                          trigger_high=0.0, signal_type=None, last_calc=0.0, last_price=last_price)
+
+
+def test_time_exit_fires_at_its_minute(fake_ib):
+    trade = make_trade("t1", exit_cfg={"time": {"enabled": True, "value": "15:30"}})
+    app._store_trade(trade)
+
+    asyncio.run(app._run_time_exits(15 * 60 + 29))
+    assert trade["status"] == "filled"
+    assert fake_ib.sells == []
+
+    asyncio.run(app._run_time_exits(15 * 60 + 30))
+    assert trade["status"] == "closed"
+    assert fake_ib.sells == [(101, "SELL", 2)]
+    assert app._time_exit_heap == []
+
+
+def test_time_exit_fires_after_its_minute(fake_ib):
+    early = make_trade("t1", exit_cfg={"time": {"enabled": True, "value": "09:45"}}, con_id=101)
+    later = make_trade("t2", exit_cfg={"time": {"enabled": True, "value": "10:15"}}, con_id=102)
+    app._store_trade(later)
+    app._store_trade(early)
+
+    # A tick that lands after both minutes fires both, earliest first
+    asyncio.run(app._run_time_exits(11 * 60))
+    assert early["status"] == later["status"] == "closed"
+    assert fake_ib.sells == [(101, "SELL", 2), (102, "SELL", 2)]
+
+
+def test_time_exit_skips_closed_and_removed_trades(fake_ib):
+    closed = make_trade("t1", exit_cfg={"time": {"enabled": True, "value": "10:00"}})
+    removed = make_trade("t2", exit_cfg={"time": {"enabled": True, "value": "10:00"}})
+    app._store_trade(closed)
+    app._store_trade(removed)
+    closed["status"] = "closed"
+    del app._active_trades["t2"]
+
+    asyncio.run(app._run_time_exits(10 * 60))
+    assert fake_ib.sells == []
+    assert app._time_exit_heap == []  # stale entries are popped, not left behind
+
+
+def test_price_exits_only_for_watches_with_prices(fake_ib):
+    ma_exit = {"ma": {"enabled": True, "cond": "above", "dir": "+", "pts": 5}}
+    ticked = make_trade("t1", watch_id="w1", exit_cfg=ma_exit, con_id=101)
+    idle = make_trade("t2", watch_id="w2", exit_cfg=ma_exit, con_id=102)
+    app._store_trade(ticked)
+    app._store_trade(idle)
+    # Both watches are past their exit target; only w1 got a price this tick
+    thresholds = {"w1": make_threshold(100.0, 110.0), "w2": make_threshold(100.0, 110.0)}
+
+    asyncio.run(app._run_price_exits({"w1": {"price": 110.0}}, {}, thresholds))
+    assert ticked["status"] == "closed"
+    assert idle["status"] == "filled"
+    assert fake_ib.sells == [(101, "SELL", 2)]
+
+
+def test_price_exits_drop_closed_trades_from_index(fake_ib):
+    trade = make_trade("t1", exit_cfg={"ma": {"enabled": True, "cond": "above", "dir": "+", "pts": 5}})
+    app._store_trade(trade)
+    trade["status"] = "closed"
+
+    asyncio.run(app._run_price_exits({"w1": {"price": 110.0}}, {"w1": make_threshold(100.0, 110.0)}, {}))
+    assert fake_ib.sells == []
+    assert "w1" not in app._exits_by_watch
@@ -0,0 +1,49 @@
+"""ma_bb_last (the MA/BB numbers behind trading signals) against pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy import _ma_bb
+
+
+def random_closes(n, seed):
+    rng = np.random.default_rng(seed)
+    return 100.0 + np.cumsum(rng.normal(0.0, 1.5, n))
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("period", [1, 2, 5, 21, 55])
+def test_ma_bb_last_matches_pandas(kernels, seed, period):
+    closes = random_closes(period + 1 + seed * 7, seed)
+    s = pd.Series(closes)
+    ma = s.rolling(period).mean()
+    std = s.rolling(period).std(ddof=1)
+
+    got_ma, got_prev, got_std, got_upper, got_lower = kernels.ma_bb_last(closes, period, 2.0, 1)
+    assert got_ma == pytest.approx(ma.iloc[-1], rel=1e-12)
+    assert got_prev == pytest.approx(ma.iloc[-2], rel=1e-12)
+    if period == 1:
+        assert np.isnan(got_std) and np.isnan(std.iloc[-1])
+    else:
+        assert got_std == pytest.approx(std.iloc[-1], rel=1e-9)
+        assert got_upper == pytest.approx(ma.iloc[-1] + 2.0 * std.iloc[-1], rel=1e-9)
+        assert got_lower == pytest.approx(ma.iloc[-1] - 2.0 * std.iloc[-1], rel=1e-9)
+
+
+def test_ma_bb_last_propagates_nan(kernels):
+    closes = random_closes(30, 0)
+    closes[-3] = np.nan
+    ma, prev_ma, std, _, _ = kernels.ma_bb_last(closes, 5, 2.0, 1)
+    assert np.isnan(ma) and np.isnan(prev_ma) and np.isnan(std)
+
+
+def test_ma_bb_wrapper():
+    closes = random_closes(40, 1)
+    s = pd.Series(closes)
+    ma, prev_ma, std = _ma_bb(closes, 21, 2.0)
+    assert ma == pytest.approx(s.rolling(21).mean().iloc[-1])
+    assert prev_ma == pytest.approx(s.rolling(21).mean().iloc[-2])
+    assert std == pytest.approx(s.rolling(21).std(ddof=1).iloc[-1])
+    assert _ma_bb(closes[:21], 21) is None  # needs period + 1 closes for prev_ma
+    closes[-1] = np.nan
+    assert _ma_bb(closes, 21) is None
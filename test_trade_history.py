@@ -0,0 +1,66 @@
+"""Closed-trade log (trades.jsonl) and GET /api/trades/history."""
+import asyncio
+from datetime import datetime
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "TRADE_LOG_FILE", tmp_path / "trades.jsonl")
+    return TestClient(app.app)  # no lifespan: nothing to load or connect
+
+
+def make_trade(trade_id):
+    return {
+        "id": trade_id,
+        "watch_id": None,
+        "symbol": "TEST",
+        "status": "filled",
+        "direction": "BUY",
+        "orders": [{"conId": 101, "qty_requested": 2, "avgFillPrice": 1.25}],
+        "exit": {"loop": False},
+    }
+
+
+def close_trades(*trade_ids):
+    async def close_all():
+        for trade_id in trade_ids:
+            await app._close_trade_and_reset(make_trade(trade_id), "test")
+    asyncio.run(close_all())
+
+
+def test_trade_log_record_format(client):
+    close_trades("t1")
+    lines = app.TRADE_LOG_FILE.read_bytes().splitlines()
+    assert len(lines) == 1
+    record = orjson.loads(lines[0])
+    assert record == {**make_trade("t1"), "status": "closed", "closed_at": record["closed_at"]}
+    datetime.fromisoformat(record["closed_at"])
+
+
+def test_history_is_newest_first(client):
+    close_trades("t1", "t2", "t3")
+    history = client.get("/api/trades/history").json()
+    assert [t["id"] for t in history] == ["t3", "t2", "t1"]
+    assert all(t["status"] == "closed" and t["closed_at"] for t in history)
+    assert history[0]["orders"] == make_trade("t3")["orders"]
+
+
+def test_history_limit_keeps_newest(client):
+    close_trades("t1", "t2", "t3")
+    assert [t["id"] for t in client.get("/api/trades/history?limit=2").json()] == ["t3", "t2"]
+    assert len(client.get("/api/trades/history?limit=0").json()) == 3  # 0 = no limit
+
+
+def test_history_skips_blank_lines(client):
+    app.TRADE_LOG_FILE.write_bytes(b'{"id":"t1"}\n\n{"id":"t2"}\n  \n')
+    assert [t["id"] for t in client.get("/api/trades/history").json()] == ["t2", "t1"]
+
+
+def test_history_without_log_file(client):
+    assert client.get("/api/trades/history").json() == []